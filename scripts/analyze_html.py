@@ -5,12 +5,19 @@ Analyze HTML files for GitHub Pages compatibility and optimization opportunities
 """
 
 import os
+import re
 import sys
 import json
+import struct
+import importlib.util
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple
+from dataclasses import asdict, dataclass, field
 import argparse
+from urllib.parse import unquote, urlsplit
 
 try:
     from bs4 import BeautifulSoup
@@ -23,6 +30,39 @@ except ImportError as e:
     sys.exit(1)
 
 
+# Bump when analysis checks change so cached results are recomputed
+ANALYZER_VERSION = 5
+DEFAULT_CACHE_FILE = ".cache/analyze-html.json"
+DEFAULT_DIMENSIONS_FILE = ".cache/image-dimensions.json"
+DEFAULT_PARSER = "stream"
+# Pages that are entry points, so never reported as orphans
+ENTRY_PAGES = {"index.html"}
+GALLERY_IMAGES_DIR = "gallery/images/"
+# Per-category index written by sync-gallery.py; pages that fetch it fill
+# their project cards from it at runtime instead of with static <img> srcs
+GALLERY_INDEX_NAME = "gallery-index.json"
+GALLERY_CARD_RE = re.compile(r'class="[^"]*\bproject-card\b[^"]*"[^>]*\bdata-category="([^"]+)"')
+
+# Page-weight budgets per page in KB, overridable with --budget KIND=KB
+DEFAULT_BUDGETS_KB = {"total": 1500, "html": 100, "css": 150, "js": 300, "images": 1000}
+ASSET_KINDS = {
+    ".css": "css",
+    ".js": "js", ".mjs": "js",
+    ".jpg": "images", ".jpeg": "images", ".png": "images", ".gif": "images",
+    ".webp": "images", ".avif": "images", ".svg": "images", ".ico": "images"
+}
+# url(...) and @import "..." references inside local stylesheets
+CSS_URL_RE = re.compile(r"url\(\s*['\"]?([^'\")\s]+)|@import\s+['\"]([^'\"]+)['\"]")
+
+# Images larger than this in either dimension, or heavier than this, are
+# flagged for optimization
+LARGE_IMAGE_PIXELS = 2000
+LARGE_IMAGE_BYTES = 500 * 1024
+
+# JPEG start-of-frame markers (C4, C8 and CC are DHT, JPG and DAC)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
 @dataclass
 class AnalysisResult:
     """Result of HTML file analysis."""
@@ -35,35 +75,716 @@ class AnalysisResult:
     issues: List[str]
     recommendations: List[str]
     github_pages_compatible: bool
+    # Local images the page references, relative to the docs directory
+    local_images: List[str] = field(default_factory=list)
+    # Raw <a href> targets and img/script/link/srcset asset URLs, for the link graph
+    links: List[str] = field(default_factory=list)
+    assets: List[str] = field(default_factory=list)
+    # Candidate URLs of each <img>/<source> with a srcset (plus the img's
+    # src); the browser loads only one per element
+    alternatives: List[List[str]] = field(default_factory=list)
+    # Project cards per category that the page fills from gallery-index.json
+    gallery_cards: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class PageElements:
+    """Everything the analysis rules need from a page, collected in one pass."""
+    title: Optional[str] = None
+    meta_description: Optional[str] = None
+    # (src, alt) of each <img>, href of each <a>, src of each <script>,
+    # (rel, href) of each <link>, (img src or '' for <source>, srcset) of
+    # each element with a srcset
+    images: List[Tuple[str, str]] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    scripts: List[str] = field(default_factory=list)
+    resources: List[Tuple[str, str]] = field(default_factory=list)
+    srcsets: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def srcset_urls(srcset: str) -> List[str]:
+    """URLs of a srcset's candidates ("a.jpg 320w, b.jpg 640w")."""
+    urls = []
+    for candidate in re.split(r',\s+', srcset.strip()):
+        url = candidate.split()[0].strip(',') if candidate.split() else ''
+        if url:
+            urls.append(url)
+    return urls
+
+
+def parse_bs4(content: str) -> PageElements:
+    """BeautifulSoup tree with html.parser, walked once for every tag of interest."""
+    soup = BeautifulSoup(content, 'html.parser')
+    page = PageElements()
+    for tag in soup.find_all(['title', 'meta', 'img', 'source', 'a', 'script', 'link']):
+        if tag.name == 'title':
+            if page.title is None and tag is soup.title and tag.string:
+                # Plain str: a NavigableString drags the whole tree along when pickled
+                page.title = str(tag.string)
+        elif tag.name == 'meta':
+            if page.meta_description is None and tag.get('name') == 'description':
+                page.meta_description = tag.get('content', '')
+        elif tag.name == 'img':
+            page.images.append((tag.get('src') or '', tag.get('alt') or ''))
+            if tag.get('srcset'):
+                page.srcsets.append((tag.get('src') or '', tag.get('srcset')))
+        elif tag.name == 'source':
+            if tag.get('srcset'):
+                page.srcsets.append(('', tag.get('srcset')))
+        elif tag.name == 'a':
+            page.links.append(tag.get('href') or '')
+        elif tag.name == 'link':
+            # bs4 splits rel into a list
+            page.resources.append((' '.join(tag.get('rel') or []).lower(), tag.get('href') or ''))
+        else:
+            page.scripts.append(tag.get('src') or '')
+    return page
+
+
+class _StreamCollector(HTMLParser):
+    """Tokenizer callbacks that fill a PageElements without building a tree.
+
+    Uses the same tokenizer as BeautifulSoup's html.parser backend, so the
+    tags and attributes seen are the same.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.page = PageElements()
+        self._title: Optional[List[str]] = None
+        self._title_done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._title is not None:
+            # Markup inside <title>: no single string, as with bs4's .string
+            self._title = None
+            self._title_done = True
+        attributes = dict(attrs)
+        if tag == 'title' and not self._title_done:
+            self._title = []
+        elif tag == 'meta':
+            if self.page.meta_description is None and attributes.get('name') == 'description':
+                self.page.meta_description = attributes.get('content') or ''
+        elif tag == 'img':
+            self.page.images.append((attributes.get('src') or '', attributes.get('alt') or ''))
+            if attributes.get('srcset'):
+                self.page.srcsets.append((attributes.get('src') or '', attributes['srcset']))
+        elif tag == 'source':
+            if attributes.get('srcset'):
+                self.page.srcsets.append(('', attributes['srcset']))
+        elif tag == 'a':
+            self.page.links.append(attributes.get('href') or '')
+        elif tag == 'script':
+            self.page.scripts.append(attributes.get('src') or '')
+        elif tag == 'link':
+            rel = ' '.join((attributes.get('rel') or '').split()).lower()
+            self.page.resources.append((rel, attributes.get('href') or ''))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_data(self, data):
+        if self._title is not None:
+            self._title.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._title is not None:
+            self.page.title = "".join(self._title) or None
+            self._title = None
+            self._title_done = True
+
+
+def parse_stream(content: str) -> PageElements:
+    """Single streaming pass with the standard library tokenizer."""
+    collector = _StreamCollector()
+    collector.feed(content)
+    collector.close()
+    return collector.page
+
+
+def parse_lxml(content: str) -> PageElements:
+    """lxml (libxml2) parse, iterating the tree once."""
+    import lxml.html
+
+    root = lxml.html.document_fromstring(content)
+    page = PageElements()
+    for element in root.iter('title', 'meta', 'img', 'source', 'a', 'script', 'link'):
+        if element.tag == 'title':
+            if page.title is None and element.text and len(element) == 0:
+                page.title = element.text
+        elif element.tag == 'meta':
+            if page.meta_description is None and element.get('name') == 'description':
+                page.meta_description = element.get('content') or ''
+        elif element.tag == 'img':
+            page.images.append((element.get('src') or '', element.get('alt') or ''))
+            if element.get('srcset'):
+                page.srcsets.append((element.get('src') or '', element.get('srcset')))
+        elif element.tag == 'source':
+            if element.get('srcset'):
+                page.srcsets.append(('', element.get('srcset')))
+        elif element.tag == 'a':
+            page.links.append(element.get('href') or '')
+        elif element.tag == 'link':
+            rel = ' '.join((element.get('rel') or '').split()).lower()
+            page.resources.append((rel, element.get('href') or ''))
+        else:
+            page.scripts.append(element.get('src') or '')
+    return page
+
+
+PARSERS = {
+    "bs4": parse_bs4,
+    "stream": parse_stream,
+    "lxml": parse_lxml
+}
+
+
+def parser_available(name: str) -> bool:
+    """Whether a parser backend's dependencies are installed."""
+    return name != "lxml" or importlib.util.find_spec("lxml") is not None
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _jpeg_size(f: BinaryIO) -> Optional[Tuple[int, int]]:
+    """Walk JPEG marker segments to the start-of-frame header."""
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code == 0xFF:
+            # Fill byte before a marker
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:
+            # Markers without a length
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if code in JPEG_SOF_MARKERS:
+            header = f.read(5)
+            if len(header) < 5:
+                return None
+            height, width = struct.unpack('>xHH', header)
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def probe_image_size(path: Path) -> Optional[Tuple[int, int]]:
+    """Read an image's (width, height) from its header bytes only.
+
+    Understands JPEG (SOF), PNG (IHDR), GIF and WebP (VP8, VP8L, VP8X);
+    falls back to Pillow for other formats. Returns None if unreadable.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(30)
+        if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                return (int.from_bytes(head[24:27], 'little') + 1,
+                        int.from_bytes(head[27:30], 'little') + 1)
+        if head[:2] == b'\xff\xd8':
+            size = _jpeg_size(f)
+            if size:
+                return size
+
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except Exception:
+        return None
+
+
+class ImageDimensions:
+    """Memoized image dimensions and byte sizes, persisted between runs.
+
+    Entries are keyed by path and reused while the file's size and mtime
+    are unchanged, so an image referenced from many pages is probed once.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.probed: Dict[str, Dict] = {}
+        if path:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        if not self.path or not self.probed:
+            return
+        # Forget images that no longer exist
+        self.entries = {key: entry for key, entry in self.entries.items() if Path(key).exists()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self.probed = {}
+
+    def get(self, image_path: Path) -> Optional[Dict]:
+        """``{width, height, bytes}`` for an image, or None if missing or unreadable."""
+        try:
+            stat = image_path.stat()
+        except OSError:
+            return None
+
+        key = str(image_path)
+        entry = self.entries.get(key)
+        if entry and entry['mtime'] == stat.st_mtime_ns and entry['bytes'] == stat.st_size:
+            return entry if entry['width'] is not None else None
+
+        size = probe_image_size(image_path)
+        entry = {
+            "mtime": stat.st_mtime_ns,
+            "bytes": stat.st_size,
+            "width": size[0] if size else None,
+            "height": size[1] if size else None
+        }
+        self.entries[key] = self.probed[key] = entry
+        return entry if size else None
+
+    def merge(self, entries: Dict[str, Dict]):
+        """Add entries probed elsewhere (by pool workers)."""
+        self.entries.update(entries)
+        self.probed.update(entries)
+
+
+class AnalysisCache:
+    """On-disk cache of analysis results.
+
+    A cached result is reused while the page's content hash, the analyzer
+    version and the hashes of the local images it references all match.
+    Image hashes are only recomputed when an image's size or mtime changed.
+    """
+
+    def __init__(self, path: Path, docs_dir: Path):
+        self.path = path
+        self.docs_dir = docs_dir
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == ANALYZER_VERSION:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        # Forget pages that no longer exist
+        self.entries = {key: entry for key, entry in self.entries.items() if Path(key).exists()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": ANALYZER_VERSION, "entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def _image_signature(self, image: str, previous: Optional[Dict] = None) -> Optional[Dict]:
+        """Size, mtime and hash of a local image (None if missing); the hash
+        is reused from ``previous`` when size and mtime match."""
+        try:
+            stat = (self.docs_dir / image).stat()
+        except OSError:
+            return None
+        if previous and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime_ns:
+            return previous
+        return {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": file_hash(self.docs_dir / image)
+        }
+
+    def get(self, file_path: Path) -> Optional[AnalysisResult]:
+        """Cached result for a page, if it and its images are unchanged."""
+        entry = self.entries.get(str(file_path))
+        if entry and entry['hash'] == file_hash(file_path):
+            images = {
+                image: self._image_signature(image, previous)
+                for image, previous in entry['images'].items()
+            }
+            if all(
+                (images[image] or {}).get('hash') == (previous or {}).get('hash')
+                for image, previous in entry['images'].items()
+            ):
+                # Keep refreshed mtimes so the images are not rehashed next run
+                entry['images'] = images
+                self.hits += 1
+                return AnalysisResult(**entry['result'])
+
+        self.misses += 1
+        return None
+
+    def put(self, file_path: Path, result: AnalysisResult):
+        self.entries[str(file_path)] = {
+            "hash": file_hash(file_path),
+            "images": {image: self._image_signature(image) for image in result.local_images},
+            "result": asdict(result)
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class LinkGraph:
+    """Internal links and assets between the analyzed pages.
+
+    Built in one pass over every page's links and assets. Each distinct
+    (directory, URL) pair is resolved once and each target is checked on
+    disk once, so the work is linear in the total number of links. Photos a
+    page loads at runtime from gallery-index.json count as its assets.
+    """
+
+    def __init__(self, docs_dir: Path, results: List[AnalysisResult]):
+        self.docs_dir = docs_dir
+        self.root = docs_dir.resolve()
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}
+        self._exists: Dict[str, bool] = {}
+        # page -> internal pages it links to / local assets it loads
+        self.pages: Dict[str, set] = {}
+        self.assets: Dict[str, set] = {}
+        # page -> srcset candidate groups (resolved), one file loaded per group
+        self.alternatives: Dict[str, List[set]] = {}
+        self.broken_links: List[Dict[str, str]] = []
+        self.missing_assets: List[Dict[str, str]] = []
+        self.internal_links = 0
+        self._gallery_indexes: Dict[str, Optional[List[Dict]]] = {}
+
+        for result in results:
+            page = self.page_key(result.file_path)
+            self.pages[page] = set()
+            self.assets[page] = set()
+            for href in result.links:
+                target = self.resolve(page, href)
+                if target is None or target == page:
+                    continue
+                self.internal_links += 1
+                if self.exists(target):
+                    self.pages[page].add(target)
+                else:
+                    self.broken_links.append({"page": page, "href": href, "target": target})
+            for url in result.assets:
+                target = self.resolve(page, url)
+                if target is None:
+                    continue
+                self.assets[page].add(target)
+                if not self.exists(target):
+                    self.missing_assets.append({"page": page, "src": url, "target": target})
+            self.alternatives[page] = [
+                {target for target in (self.resolve(page, url) for url in group) if target}
+                for group in result.alternatives
+            ]
+            for category, cards in result.gallery_cards.items():
+                self.add_gallery_index(page, category, cards)
+
+    def gallery_index(self, category: str) -> Optional[List[Dict]]:
+        """Images listed in a category's gallery-index.json, read once;
+        None if it is missing or unreadable."""
+        if category not in self._gallery_indexes:
+            try:
+                with open(self.docs_dir / GALLERY_IMAGES_DIR / category / GALLERY_INDEX_NAME) as f:
+                    self._gallery_indexes[category] = json.load(f)['images']
+            except (OSError, ValueError, KeyError, TypeError):
+                self._gallery_indexes[category] = None
+        return self._gallery_indexes[category]
+
+    def add_gallery_index(self, page: str, category: str, cards: int):
+        """Add what a page loads through a category's gallery index: the
+        index itself plus, for each of its ``cards``, the photo the page's
+        script shows (its JPEG variants form the srcset). Every file the
+        index lists is checked on disk, shown or not."""
+        index_path = f"{GALLERY_IMAGES_DIR}{category}/{GALLERY_INDEX_NAME}"
+        images = self.gallery_index(category)
+        self.assets[page].add(index_path)
+        if images is None:
+            self.missing_assets.append({"page": page, "src": index_path, "target": index_path})
+            return
+
+        for position, image in enumerate(images):
+            srcset = [variant['src'] for variant in image.get('variants', [])
+                      if variant.get('format') == 'JPEG']
+            paths = [image['src']] + [variant['src'] for variant in image.get('variants', [])]
+            for path in paths:
+                target = f"{GALLERY_IMAGES_DIR}{path}"
+                if not self.exists(target):
+                    self.missing_assets.append({"page": page, "src": path, "target": target})
+            if position < cards:
+                group = {f"{GALLERY_IMAGES_DIR}{path}" for path in [image['src']] + srcset}
+                self.assets[page].update(group)
+                self.alternatives[page].append(group)
+
+    def page_key(self, file_path: str) -> str:
+        """Page path relative to the docs directory, in URL form."""
+        try:
+            return Path(file_path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return Path(file_path).name
+
+    def resolve(self, page: str, url: str) -> Optional[str]:
+        """Docs-relative target of a URL on ``page``; None for external
+        URLs (other schemes or hosts) and same-page fragments."""
+        base = page.rpartition('/')[0]
+        key = (base, url)
+        if key not in self._resolved:
+            self._resolved[key] = self._resolve(base, url)
+        target = self._resolved[key]
+        # Bare fragments and queries point back at the page itself
+        return page if target == '' else target
+
+    def _resolve(self, base: str, url: str) -> Optional[str]:
+        parts = urlsplit(url.strip())
+        if parts.scheme or parts.netloc:
+            return None
+        if not parts.path:
+            return ''
+        path = unquote(parts.path)
+        if path.startswith('/'):
+            path = path.lstrip('/')
+        elif base:
+            path = f"{base}/{path}"
+        if path == '' or path.endswith('/'):
+            path += 'index.html'
+        # Normalise ./ and ../ without touching the filesystem
+        resolved: List[str] = []
+        for segment in path.split('/'):
+            if segment == '..':
+                if resolved:
+                    resolved.pop()
+                else:
+                    resolved.append('..')
+            elif segment not in ('', '.'):
+                resolved.append(segment)
+        return '/'.join(resolved)
+
+    def exists(self, target: str) -> bool:
+        if target not in self._exists:
+            self._exists[target] = (not target.startswith('..')
+                                    and (self.docs_dir / target).is_file())
+        return self._exists[target]
+
+    @property
+    def orphan_pages(self) -> List[str]:
+        """Analyzed pages that no other analyzed page links to."""
+        linked = set().union(*self.pages.values()) if self.pages else set()
+        return sorted(page for page in self.pages
+                      if page not in linked and Path(page).name not in ENTRY_PAGES)
+
+    @property
+    def missing_gallery_images(self) -> List[str]:
+        return sorted({asset['target'] for asset in self.missing_assets
+                       if asset['target'].startswith(GALLERY_IMAGES_DIR)})
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "pages": len(self.pages),
+            "internal_links": self.internal_links,
+            "broken_links": self.broken_links,
+            "missing_assets": self.missing_assets,
+            "missing_gallery_images": self.missing_gallery_images,
+            "orphan_pages": self.orphan_pages
+        }
+
+
+class PageWeights:
+    """Transfer size of every page: its HTML plus the local CSS, scripts,
+    images and other files it loads (and what its stylesheets import).
+
+    Uses the link graph's resolved assets. Each file is stat'ed once and
+    each stylesheet scanned once, however many pages share them. Missing
+    assets weigh nothing here; the link checker reports them.
+    """
+
+    def __init__(self, graph: LinkGraph, budgets_kb: Dict[str, int]):
+        self.graph = graph
+        self.budgets_kb = budgets_kb
+        self._sizes: Dict[str, int] = {}
+        self._imports: Dict[str, List[str]] = {}
+        self.pages: Dict[str, Dict[str, Any]] = {}
+
+        page_assets = {
+            page: self.expand({asset for asset in assets if graph.exists(asset)})
+            for page, assets in graph.assets.items()
+        }
+        shared_by: Dict[str, int] = {}
+        for assets in page_assets.values():
+            for asset in assets:
+                shared_by[asset] = shared_by.get(asset, 0) + 1
+        self.assets = {asset: {"bytes": self.size(asset), "kind": self.kind(asset), "pages": count}
+                       for asset, count in sorted(shared_by.items())}
+
+        for page, assets in page_assets.items():
+            loaded = self.loaded_assets(assets, graph.alternatives.get(page, []))
+            bytes_by_kind = {"html": self.size(page), "css": 0, "js": 0, "images": 0, "other": 0}
+            for asset in loaded:
+                bytes_by_kind[self.kind(asset)] += self.assets[asset]["bytes"]
+            total = sum(bytes_by_kind.values())
+            gallery = [a for a in loaded if a.startswith(GALLERY_IMAGES_DIR)]
+            self.pages[page] = {
+                "bytes": total,
+                "by_kind": bytes_by_kind,
+                "gallery_bytes": sum(self.assets[a]["bytes"] for a in gallery),
+                # Already cached by the browser when arriving from another page
+                "shared_bytes": sum(
+                    self.assets[a]["bytes"] for a in loaded if self.assets[a]["pages"] > 1
+                ),
+                "over_budget": self.over_budget(dict(bytes_by_kind, total=total))
+            }
+
+    def loaded_assets(self, assets: set, alternatives: List[set]) -> set:
+        """The assets a page transfers: everything it references, except
+        that of each srcset's candidates only the largest is counted (the
+        worst case; the browser picks one)."""
+        candidates = set().union(*alternatives) if alternatives else set()
+        loaded = assets - candidates
+        for group in alternatives:
+            present = [asset for asset in group if asset in assets]
+            if present:
+                loaded.add(max(present, key=lambda asset: (self.size(asset), asset)))
+        return loaded
+
+    def size(self, target: str) -> int:
+        if target not in self._sizes:
+            try:
+                self._sizes[target] = (self.graph.docs_dir / target).stat().st_size
+            except OSError:
+                self._sizes[target] = 0
+        return self._sizes[target]
+
+    @staticmethod
+    def kind(target: str) -> str:
+        if target.endswith('.html'):
+            return "html"
+        return ASSET_KINDS.get(Path(target).suffix.lower(), "other")
+
+    def expand(self, assets: set) -> set:
+        """Assets plus everything their stylesheets pull in, transitively."""
+        found = set(assets)
+        pending = [asset for asset in assets if self.kind(asset) == "css"]
+        while pending:
+            for target in self.css_imports(pending.pop()):
+                if target not in found:
+                    found.add(target)
+                    if self.kind(target) == "css":
+                        pending.append(target)
+        return found
+
+    def css_imports(self, stylesheet: str) -> List[str]:
+        """Local files a stylesheet references, resolved from its directory."""
+        if stylesheet not in self._imports:
+            try:
+                css = (self.graph.docs_dir / stylesheet).read_text(encoding='utf-8',
+                                                                   errors='replace')
+            except OSError:
+                css = ""
+            targets = []
+            for match in CSS_URL_RE.finditer(css):
+                target = self.graph.resolve(stylesheet, match.group(1) or match.group(2))
+                if target and target != stylesheet and self.graph.exists(target):
+                    targets.append(target)
+            self._imports[stylesheet] = targets
+        return self._imports[stylesheet]
+
+    def over_budget(self, bytes_by_kind: Dict[str, int]) -> List[str]:
+        return [
+            f"{kind} {bytes_by_kind[kind] / 1024:.0f} KB > {budget} KB"
+            for kind, budget in self.budgets_kb.items()
+            if bytes_by_kind.get(kind, 0) > budget * 1024
+        ]
+
+    def report(self, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Weights for the report; ``previous`` is an earlier report's
+        weight section, used to add each page's change in bytes."""
+        previous_pages = (previous or {}).get("pages", {})
+        pages = {}
+        for page, weight in self.pages.items():
+            pages[page] = dict(weight)
+            if page in previous_pages:
+                pages[page]["delta_bytes"] = weight["bytes"] - previous_pages[page]["bytes"]
+        return {
+            "budgets_kb": self.budgets_kb,
+            # Every page loaded once, shared assets counted once
+            "site_bytes": (sum(self.size(page) for page in self.pages)
+                           + sum(asset["bytes"] for asset in self.assets.values())),
+            "over_budget": sorted(
+                page for page, weight in self.pages.items() if weight["over_budget"]
+            ),
+            "pages": pages,
+            "assets": self.assets
+        }
 
 
 class HTMLAnalyzer:
     """Analyze HTML files for FreshThreads project."""
 
-    def __init__(self, docs_dir: str = "docs"):
+    def __init__(self, docs_dir: str = "docs", jobs: int = 1,
+                 cache_file: Optional[str] = DEFAULT_CACHE_FILE, parser: str = DEFAULT_PARSER):
         self.docs_dir = Path(docs_dir)
+        self.jobs = jobs
+        self.parser = parser
+        self.verbose = True
+        self.cache = AnalysisCache(Path(cache_file), self.docs_dir) if cache_file else None
+        self.dimensions = ImageDimensions(Path(DEFAULT_DIMENSIONS_FILE) if cache_file else None)
         self.results: List[AnalysisResult] = []
+        # Only built by analyze_all: orphans need every page
+        self.link_graph: Optional[LinkGraph] = None
+        self.budgets_kb = dict(DEFAULT_BUDGETS_KB)
+        self._page_weights: Optional[PageWeights] = None
+
+    def analyze_cached(self, file_path: Path) -> AnalysisResult:
+        """Analyze a file, serving it from the cache when unchanged."""
+        if self.cache:
+            result = self.cache.get(file_path)
+            if result:
+                return result
+        result = self.analyze_file(file_path)
+        if self.cache:
+            self.cache.put(file_path, result)
+        return result
 
     def analyze_file(self, file_path: Path) -> AnalysisResult:
         """Analyze a single HTML file."""
-        print(f"🔍 Analyzing {file_path}")
+        if self.verbose:
+            print(f"🔍 Analyzing {file_path}")
 
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        soup = BeautifulSoup(content, 'html.parser')
+        page = PARSERS[self.parser](content)
 
         # Extract basic info
-        title = soup.title.string if soup.title else "No title"
-        meta_desc = ""
-        meta_description = soup.find('meta', attrs={'name': 'description'})
-        if meta_description:
-            meta_desc = meta_description.get('content', '')
-
-        # Count elements
-        images = soup.find_all('img')
-        links = soup.find_all('a')
-        scripts = soup.find_all('script')
+        title = page.title or "No title"
+        meta_desc = page.meta_description or ""
 
         # Check for issues
         issues = []
@@ -78,7 +799,7 @@ class HTMLAnalyzer:
             github_pages_compatible = False
 
         # Check for missing alt attributes
-        images_without_alt = [img for img in images if not img.get('alt')]
+        images_without_alt = [src for src, alt in page.images if not alt]
         if images_without_alt:
             issues.append(f"{len(images_without_alt)} images missing alt attributes")
             recommendations.append("Add alt attributes to all images for accessibility")
@@ -92,51 +813,71 @@ class HTMLAnalyzer:
             recommendations.append("Shorten meta description to 150-160 characters")
 
         # Check for external scripts that might not work on GitHub Pages
-        for script in scripts:
-            src = script.get('src', '')
+        for src in page.scripts:
             if 'localhost' in src:
                 issues.append("Script references localhost - will break in production")
                 github_pages_compatible = False
 
         # Check for large images (estimate)
         large_images = []
-        for img in images:
-            src = img.get('src', '')
+        local_images = []
+        for src, _ in page.images:
             if src and not src.startswith('http'):
-                img_path = self.docs_dir / src.lstrip('/')
-                if img_path.exists():
-                    try:
-                        with Image.open(img_path) as image:
-                            if image.size[0] > 2000 or image.size[1] > 2000:
-                                large_images.append(src)
-                    except Exception:
-                        pass
+                local_images.append(src.lstrip('/'))
+                info = self.dimensions.get(self.docs_dir / src.lstrip('/'))
+                if info and (max(info['width'], info['height']) > LARGE_IMAGE_PIXELS
+                             or info['bytes'] > LARGE_IMAGE_BYTES):
+                    large_images.append(info)
 
         if large_images:
-            recommendations.append(f"Optimize {len(large_images)} large images for web")
+            total_kb = sum(info['bytes'] for info in large_images) / 1024
+            recommendations.append(
+                f"Optimize {len(large_images)} large images for web ({total_kb:.0f} KB; "
+                f"keep under {LARGE_IMAGE_PIXELS}px and {LARGE_IMAGE_BYTES // 1024} KB)"
+            )
 
         # Check for performance improvements
-        if len(scripts) > 5:
+        if len(page.scripts) > 5:
             recommendations.append("Consider minifying or combining JavaScript files")
 
-        if len(links) > 50:
+        if len(page.links) > 50:
             recommendations.append("Consider pagination or lazy loading for many links")
 
+        # Cards the page's script fills from each category's gallery index
+        gallery_cards: Dict[str, int] = {}
+        if GALLERY_INDEX_NAME in content:
+            for category in GALLERY_CARD_RE.findall(content):
+                gallery_cards[category] = gallery_cards.get(category, 0) + 1
+
         return AnalysisResult(
             file_path=str(file_path),
             title=title,
             meta_description=meta_desc,
-            image_count=len(images),
-            link_count=len(links),
-            script_count=len(scripts),
+            image_count=len(page.images),
+            link_count=len(page.links),
+            script_count=len(page.scripts),
             issues=issues,
             recommendations=recommendations,
-            github_pages_compatible=github_pages_compatible
+            github_pages_compatible=github_pages_compatible,
+            local_images=sorted(set(local_images)),
+            links=[href for href in page.links if href],
+            assets=[url for url in [src for src, _ in page.images] + page.scripts
+                    + [href for _, href in page.resources]
+                    + [url for _, srcset in page.srcsets for url in srcset_urls(srcset)] if url],
+            alternatives=[
+                [url for url in [src] + srcset_urls(srcset) if url]
+                for src, srcset in page.srcsets
+            ],
+            gallery_cards=gallery_cards
         )
 
     def analyze_all(self) -> List[AnalysisResult]:
-        """Analyze all HTML files in the docs directory."""
-        html_files = list(self.docs_dir.glob('*.html'))
+        """Analyze all HTML files in the docs directory.
+
+        With ``jobs`` > 1 files are analyzed on a process pool; results are
+        still returned in file name order.
+        """
+        html_files = sorted(self.docs_dir.glob('*.html'))
 
         if not html_files:
             print("❌ No HTML files found in docs directory")
@@ -144,15 +885,69 @@ class HTMLAnalyzer:
 
         print(f"📋 Found {len(html_files)} HTML files")
 
+        # Unchanged pages come from the cache; only the rest are parsed
+        results: Dict[Path, AnalysisResult] = {}
+        pending = []
         for file_path in html_files:
-            try:
-                result = self.analyze_file(file_path)
-                self.results.append(result)
-            except Exception as e:
-                print(f"❌ Error analyzing {file_path}: {e}")
+            cached = self.cache.get(file_path) if self.cache else None
+            if cached:
+                results[file_path] = cached
+            else:
+                pending.append(file_path)
+        if self.cache:
+            print(f"🗃️  {len(results)} unchanged (cached), {len(pending)} to analyze")
+
+        if self.jobs > 1 and len(pending) > 1:
+            results.update(self._analyze_parallel(pending))
+        else:
+            for file_path in pending:
+                try:
+                    results[file_path] = self.analyze_file(file_path)
+                except Exception as e:
+                    print(f"❌ Error analyzing {file_path}: {e}")
+
+        if self.cache:
+            for file_path in pending:
+                if file_path in results:
+                    self.cache.put(file_path, results[file_path])
+            self.cache.save()
+        self.dimensions.save()
 
+        self.results.extend(results[file_path] for file_path in html_files if file_path in results)
+        self.link_graph = LinkGraph(self.docs_dir, self.results)
+        self._page_weights = None
         return self.results
 
+    @property
+    def page_weights(self) -> Optional[PageWeights]:
+        """Per-page transfer sizes, once every page has been analyzed."""
+        if self._page_weights is None and self.link_graph:
+            self._page_weights = PageWeights(self.link_graph, self.budgets_kb)
+        return self._page_weights
+
+    def _analyze_parallel(self, html_files: List[Path]) -> Dict[Path, AnalysisResult]:
+        """Analyze files on a process pool, printing progress as each finishes."""
+        results: Dict[Path, AnalysisResult] = {}
+        # Workers start from the known dimensions and send back what they probe
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(html_files)),
+                                 initializer=_init_worker,
+                                 initargs=(self.dimensions.entries,)) as pool:
+            futures = {
+                pool.submit(_analyze_file_worker, str(self.docs_dir), file_path,
+                            self.parser): file_path
+                for file_path in html_files
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                file_path = futures[future]
+                try:
+                    results[file_path], probed = future.result()
+                    self.dimensions.merge(probed)
+                    print(f"🔍 [{done}/{len(html_files)}] Analyzed {file_path}")
+                except Exception as e:
+                    print(f"❌ Error analyzing {file_path}: {e}")
+
+        return results
+
     def generate_report(self, output_file: str = None) -> Dict[str, Any]:
         """Generate a comprehensive analysis report."""
         if not self.results:
@@ -174,6 +969,10 @@ class HTMLAnalyzer:
                 "total_issues": total_issues,
                 "total_recommendations": total_recommendations
             },
+            "cache": dict(self.cache.stats(), enabled=True) if self.cache else {"enabled": False},
+            "links": self.link_graph.report() if self.link_graph else None,
+            "weight": (self.page_weights.report(previous_weight(output_file))
+                       if self.page_weights else None),
             "files": []
         }
 
@@ -215,6 +1014,11 @@ class HTMLAnalyzer:
         print(f"📄 Files analyzed: {total_files}")
         print(f"✅ GitHub Pages compatible: {compatible_files}/{total_files}")
         print(f"⚠️  Total issues found: {total_issues}")
+        if self.cache:
+            print(f"🗃️  Cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        if self.link_graph:
+            self.print_links()
+            self.print_weights()
 
         print("\n📋 File Details:")
         for result in self.results:
@@ -229,6 +1033,102 @@ class HTMLAnalyzer:
                 if len(result.recommendations) > 2:
                     print(f"    💡 ... and {len(result.recommendations) - 2} more recommendations")
 
+    def watch(self):
+        """Re-analyze pages as they are saved, printing how their issues changed."""
+        from file_watcher import watch
+
+        def check(file_path: Path) -> List[str]:
+            result = self.analyze_file(file_path)
+            if self.cache:
+                self.cache.put(file_path, result)
+            return result.issues
+
+        self.verbose = False
+        initial = {Path(result.file_path): result.issues for result in self.results}
+        watch(self.docs_dir, check, initial)
+        if self.cache:
+            self.cache.save()
+        self.dimensions.save()
+
+    def print_links(self):
+        """Print broken links, missing assets and orphan pages."""
+        graph = self.link_graph
+        print(f"🔗 Links: {graph.internal_links} internal links between {len(graph.pages)} pages, "
+              f"{len(graph.broken_links)} broken, {len(graph.missing_assets)} missing assets, "
+              f"{len(graph.orphan_pages)} orphan pages")
+        for link in graph.broken_links:
+            print(f"    ❌ {link['page']} → {link['href']}")
+        missing_gallery = set(graph.missing_gallery_images)
+        for asset in graph.missing_assets:
+            if asset['target'] not in missing_gallery:
+                print(f"    ❌ {asset['page']} → {asset['src']} (missing asset)")
+        if missing_gallery:
+            print(f"    🖼️  {len(missing_gallery)} gallery images referenced but not synced:")
+            for image in sorted(missing_gallery):
+                print(f"       {image}")
+        for page in graph.orphan_pages:
+            print(f"    🏝️  {page} (no page links here)")
+
+    def print_weights(self):
+        """Print the heaviest pages and any over their budgets."""
+        weights = self.page_weights
+        heaviest = sorted(weights.pages.items(), key=lambda item: item[1]["bytes"], reverse=True)
+        over = [page for page, weight in heaviest if weight["over_budget"]]
+        heaviest_page, heaviest_weight = heaviest[0]
+        print(f"⚖️  Page weight: heaviest {heaviest_page} "
+              f"{heaviest_weight['bytes'] / 1024:.0f} KB, "
+              f"{len(over)} pages over budget")
+        for page in over:
+            print(f"    ⚠️  {page}: {', '.join(weights.pages[page]['over_budget'])}")
+
+
+def previous_weight(report_file: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Weight section of an earlier report, to track changes between runs."""
+    if not report_file:
+        return None
+    try:
+        with open(report_file, 'r') as f:
+            return json.load(f).get("weight")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def parse_budgets(values: List[str]) -> Dict[str, int]:
+    """Default budgets updated from KIND=KB arguments."""
+    budgets = dict(DEFAULT_BUDGETS_KB)
+    for value in values:
+        kind, _, kb = value.partition('=')
+        if kind not in DEFAULT_BUDGETS_KB or not kb.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"invalid budget {value!r}: use KIND=KB with KIND one of "
+                f"{', '.join(DEFAULT_BUDGETS_KB)}")
+        budgets[kind] = int(kb)
+    return budgets
+
+
+# Per-worker image dimensions, shared by every file the worker analyzes
+_worker_dimensions: Optional[ImageDimensions] = None
+
+
+def _init_worker(entries: Dict[str, Dict]):
+    global _worker_dimensions
+    _worker_dimensions = ImageDimensions()
+    _worker_dimensions.entries = dict(entries)
+
+
+def _analyze_file_worker(docs_dir: str, file_path: Path,
+                         parser: str) -> Tuple[AnalysisResult, Dict[str, Dict]]:
+    """Analyze one file in a pool worker (module-level so it can be pickled).
+
+    Returns the result and the image dimensions probed for it.
+    """
+    analyzer = HTMLAnalyzer(docs_dir, cache_file=None, parser=parser)
+    analyzer.verbose = False
+    analyzer.dimensions = _worker_dimensions
+    result = analyzer.analyze_file(file_path)
+    probed, _worker_dimensions.probed = _worker_dimensions.probed, {}
+    return result, probed
+
 
 def main():
     """Main function."""
@@ -237,10 +1137,45 @@ def main():
     parser.add_argument("--output", help="Output file for JSON report")
     parser.add_argument("--file", help="Analyze specific file instead of all files")
     parser.add_argument("--summary-only", action="store_true", help="Show only summary")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Analyze files in N parallel processes (0 = one per CPU)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Re-analyze every file instead of reusing {DEFAULT_CACHE_FILE}")
+    parser.add_argument("--check-links", action="store_true",
+                        help="Only check links and assets across all pages; "
+                             "exit 1 if any are broken or missing")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the first pass, re-analyze pages as they change")
+    parser.add_argument("--budget", action="append", default=[], metavar="KIND=KB",
+                        help="Per-page weight budget, e.g. total=1500 or js=300 (repeatable)")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default=DEFAULT_PARSER,
+                        help="HTML parser backend (all give identical results)")
 
     args = parser.parse_args()
 
-    analyzer = HTMLAnalyzer(args.docs_dir)
+    if not parser_available(args.parser):
+        print(f"❌ The {args.parser} parser needs the {args.parser} package: "
+              f"pip install {args.parser}")
+        sys.exit(1)
+
+    try:
+        budgets = parse_budgets(args.budget)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    analyzer = HTMLAnalyzer(args.docs_dir, jobs=jobs,
+                            cache_file=None if args.no_cache else DEFAULT_CACHE_FILE,
+                            parser=args.parser)
+    analyzer.budgets_kb = budgets
+
+    if args.check_links:
+        # Site-wide by nature: orphans and inbound links need every page
+        analyzer.verbose = False
+        analyzer.analyze_all()
+        graph = analyzer.link_graph
+        analyzer.print_links()
+        sys.exit(1 if graph.broken_links or graph.missing_assets else 0)
 
     if args.file:
         # Analyze single file
@@ -249,8 +1184,11 @@ def main():
             print(f"❌ File not found: {file_path}")
             sys.exit(1)
 
-        result = analyzer.analyze_file(file_path)
+        result = analyzer.analyze_cached(file_path)
         analyzer.results = [result]
+        if analyzer.cache:
+            analyzer.cache.save()
+        analyzer.dimensions.save()
     else:
         # Analyze all files
         analyzer.analyze_all()
@@ -264,6 +1202,9 @@ def main():
         if not args.output:
             print(f"\n💡 Use --output report.json to save detailed report")
 
+    if args.watch:
+        analyzer.watch()
+
 
 if __name__ == "__main__":
     main()
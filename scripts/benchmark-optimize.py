@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Gallery Optimizer Benchmark - Fast-path decode vs. full decode
+Compares the draft-mode/reduce decode used by sync-gallery.py against a
+full-resolution decode followed by a single LANCZOS resize, reporting the
+time of each and the PSNR between their outputs.
+"""
+
+import sys
+import math
+import time
+import argparse
+import tempfile
+import importlib.util
+from pathlib import Path
+from typing import List
+
+from PIL import Image, ImageChops, ImageOps, ImageStat
+
+# Import the sync module (hyphenated filename)
+sync_file = Path(__file__).parent / "sync-gallery.py"
+spec = importlib.util.spec_from_file_location("sync_gallery", sync_file)
+if not spec or not spec.loader:
+    raise ImportError("Could not load sync-gallery.py module")
+sync_gallery = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(sync_gallery)
+
+
+def reference_resize(path: str, width: int) -> Image.Image:
+    """Full decode, orientation, then a single LANCZOS resize (the old path)."""
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        if img.width > width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        return img
+
+
+def fast_resize(path: str, width: int) -> Image.Image:
+    """Draft-mode decode and reduce, then the final LANCZOS resize."""
+    with Image.open(path) as img:
+        img = sync_gallery.decode_for_width(img, width).convert('RGB')
+        if img.width > width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        return img
+
+
+def psnr(a: Image.Image, b: Image.Image) -> float:
+    """Peak signal-to-noise ratio between two same-sized RGB images, in dB."""
+    stat = ImageStat.Stat(ImageChops.difference(a, b))
+    mse = sum(rms ** 2 for rms in stat.rms) / len(stat.rms)
+    return float('inf') if mse == 0 else 20 * math.log10(255 / math.sqrt(mse))
+
+
+def best_time(func, *args, repeat: int = 3) -> float:
+    """Best wall time of ``repeat`` runs, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def generate_images(directory: Path, count: int, width: int, height: int) -> List[str]:
+    """Write synthetic phone-sized JPEGs; every other one is EXIF-rotated."""
+    paths = []
+    for i in range(count):
+        # Smooth structure plus mild sensor-like noise
+        img = Image.effect_mandelbrot((width, height), (-2 + i * 0.05, -1.2, 0.8, 1.2), 100)
+        gradient = Image.linear_gradient('L').resize((width, height))
+        noise = Image.effect_noise((width, height), 8)
+        blue = ImageChops.add(ImageChops.invert(img), noise, scale=2)
+        img = Image.merge('RGB', (img, gradient, blue))
+
+        exif = Image.Exif()
+        if i % 2:
+            exif[sync_gallery.EXIF_ORIENTATION] = 6
+
+        path = directory / f"synthetic-{i}.jpg"
+        img.save(path, format='JPEG', quality=92, exif=exif)
+        paths.append(str(path))
+    return paths
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark fast-path image decoding for the gallery sync")
+    parser.add_argument("images", nargs="*", help="Original images to test (default: synthetic)")
+    parser.add_argument("--width", type=int, default=1200, help="Output width")
+    parser.add_argument("--count", type=int, default=4, help="Synthetic images to generate")
+    parser.add_argument("--size", default="4032x3024", help="Synthetic image size (WxH)")
+    parser.add_argument("--min-psnr", type=float, default=40.0,
+                        help="Fail if any image falls below this PSNR (dB)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.images
+        if not paths:
+            width, height = (int(v) for v in args.size.split('x'))
+            print(f"🖼️  Generating {args.count} synthetic {width}x{height} images...")
+            paths = generate_images(Path(tmp), args.count, width, height)
+
+        print(f"\n{'Image':<32} {'Full (s)':>9} {'Fast (s)':>9} {'Speedup':>8} {'PSNR (dB)':>10}")
+        print("-" * 72)
+
+        total_full = total_fast = 0.0
+        worst = float('inf')
+        for path in paths:
+            full = best_time(reference_resize, path, args.width)
+            fast = best_time(fast_resize, path, args.width)
+            quality = psnr(reference_resize(path, args.width), fast_resize(path, args.width))
+
+            total_full += full
+            total_fast += fast
+            worst = min(worst, quality)
+            print(f"{Path(path).name[:32]:<32} {full:>9.3f} {fast:>9.3f} "
+                  f"{full / fast:>7.1f}x {quality:>10.1f}")
+
+        print("-" * 72)
+        print(f"{'Total':<32} {total_full:>9.3f} {total_fast:>9.3f} "
+              f"{total_full / total_fast:>7.1f}x {worst:>10.1f}")
+
+    if worst < args.min_psnr:
+        print(f"\n❌ Lowest PSNR {worst:.1f} dB is below {args.min_psnr} dB")
+        sys.exit(1)
+
+    print(f"\n✅ All outputs within {args.min_psnr} dB PSNR of the full-decode path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Benchmark - Compare analyze_html.py parser backends
+Times each available parser backend on the docs/ pages and checks that every
+backend produces the same AnalysisResult as the BeautifulSoup reference.
+"""
+
+import sys
+import time
+import argparse
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from analyze_html import PARSERS, HTMLAnalyzer, parser_available  # noqa: E402
+
+REFERENCE_PARSER = "bs4"
+
+
+def time_parser(name: str, pages: Dict[Path, str], rounds: int) -> float:
+    """Best-of-``rounds`` seconds to parse every page with one backend."""
+    parse = PARSERS[name]
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for content in pages.values():
+            parse(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def analyze_with(name: str, docs_dir: str, files: List[Path]) -> Dict[Path, Dict]:
+    """Full AnalysisResult of each file with one backend, no caches."""
+    analyzer = HTMLAnalyzer(docs_dir, cache_file=None, parser=name)
+    analyzer.verbose = False
+    return {file_path: asdict(analyzer.analyze_file(file_path)) for file_path in files}
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark the HTML analyzer's parser backends")
+    parser.add_argument("--docs-dir", default="docs", help="Directory containing HTML files")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="Timing rounds per backend (best is kept)")
+    args = parser.parse_args()
+
+    files = sorted(Path(args.docs_dir).rglob("*.html"))
+    if not files:
+        print(f"❌ No HTML files found in {args.docs_dir}")
+        sys.exit(1)
+    pages = {file_path: file_path.read_text(encoding='utf-8') for file_path in files}
+    total_kb = sum(len(content.encode('utf-8')) for content in pages.values()) / 1024
+
+    backends = [name for name in PARSERS if parser_available(name)]
+    for name in sorted(set(PARSERS) - set(backends)):
+        print(f"⚠️  Skipping {name}: not installed (pip install {name})")
+
+    print(f"⏱️  Parsing {len(files)} pages ({total_kb:.0f} KB), best of {args.rounds} rounds\n")
+    reference = analyze_with(REFERENCE_PARSER, args.docs_dir, files)
+    baseline = None
+    mismatches = 0
+
+    print(f"{'Parser':<8} {'Time (ms)':>10} {'Pages/s':>9} {'Speedup':>8}  Results")
+    print("-" * 52)
+    for name in backends:
+        seconds = time_parser(name, pages, args.rounds)
+        baseline = baseline or seconds
+        results = analyze_with(name, args.docs_dir, files)
+        differing = [file_path for file_path in files if results[file_path] != reference[file_path]]
+        mismatches += len(differing)
+        verdict = "identical" if not differing else f"{len(differing)} differ"
+        print(f"{name:<8} {seconds * 1000:>10.1f} {len(files) / seconds:>9.0f} "
+              f"{baseline / seconds:>7.1f}x  {verdict}")
+        for file_path in differing:
+            print(f"   ❌ {file_path}")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} results differ from the {REFERENCE_PARSER} parser")
+        sys.exit(1)
+    print(f"\n✅ All backends match the {REFERENCE_PARSER} parser")
+
+
+if __name__ == "__main__":
+    main()
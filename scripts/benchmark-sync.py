@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Gallery Sync Benchmark - End-to-end sync pipeline timings
+Generates a synthetic photo set in a local stand-in for Google Drive and runs
+sync-gallery.py against it in cold, warm and incremental scenarios,
+reporting wall time, per-stage throughput, peak RSS and bytes written.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import resource
+import subprocess
+import tempfile
+import importlib.util
+from pathlib import Path
+from typing import Dict, List
+
+import PIL
+from PIL import Image, ImageChops
+
+SCRIPT_DIR = Path(__file__).parent
+
+# Scenarios, in the order they must run (each builds on the previous state):
+#   cold         - empty gallery and cache
+#   warm         - gallery removed, cache kept (a fresh CI checkout)
+#   incremental  - some originals edited or added, picked up via changes
+SCENARIOS = ('cold', 'warm', 'incremental')
+
+
+def load_sync_module():
+    """Import sync-gallery.py (hyphenated filename)."""
+    spec = importlib.util.spec_from_file_location("sync_gallery", SCRIPT_DIR / "sync-gallery.py")
+    if not spec or not spec.loader:
+        raise ImportError("Could not load sync-gallery.py module")
+    module = importlib.util.module_from_spec(spec)
+    # Registered so the optimize process pool can pickle its functions
+    sys.modules["sync_gallery"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_photo(width: int, height: int, seed: int) -> Image.Image:
+    """Smooth gradients plus mild noise; compresses roughly like a photo."""
+    rng = random.Random(seed)
+    red = Image.linear_gradient('L').rotate(rng.randrange(360)).resize((width, height))
+    green = Image.radial_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), rng.uniform(6, 12))
+    blue = ImageChops.add(ImageChops.invert(red), noise, scale=2)
+    return Image.merge('RGB', (red, green, blue))
+
+
+def generate_photos(source: Path, categories: List[str], count: int, width: int, height: int,
+                    start: int = 0) -> List[Path]:
+    """Write ``count`` JPEGs spread over the category folders."""
+    paths = []
+    for i in range(start, start + count):
+        folder = source / categories[i % len(categories)]
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"IMG_{i:05d}.jpg"
+        synthetic_photo(width, height, i).save(path, format='JPEG', quality=90)
+        paths.append(path)
+    return paths
+
+
+def edit_photos(source: Path, fraction: float, seed: int) -> int:
+    """Re-encode a fraction of the originals so their checksums change."""
+    photos = sorted(source.glob('*/IMG_*.jpg'))
+    edited = random.Random(seed).sample(photos, max(1, int(len(photos) * fraction)))
+    for path in edited:
+        with Image.open(path) as img:
+            img = img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        img.save(path, format='JPEG', quality=90)
+    return len(edited)
+
+
+def run_scenario(workdir: Path, env: Dict[str, str]) -> Dict:
+    """Run one sync in a fresh process so peak RSS is per scenario."""
+    result = subprocess.run(
+        [sys.executable, __file__, '--worker', str(workdir)],
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        raise RuntimeError(f"Sync worker failed with exit code {result.returncode}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def worker(workdir: Path):
+    """Run the sync in ``workdir`` and print its metrics as one JSON line."""
+    os.chdir(workdir)
+    sync_gallery = load_sync_module()
+    sync_gallery.logger.setLevel('WARNING')
+
+    start = time.perf_counter()
+    sync = sync_gallery.GallerySync()
+    status = sync.run_sync()
+    wall = time.perf_counter() - start
+
+    # ru_maxrss is in KB on Linux; children are the optimize workers
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    metrics = status['metrics']
+    print(json.dumps({
+        "wall_seconds": round(wall, 3),
+        "status": status['status'],
+        "mode": status['mode'],
+        "files_updated": status['files_updated'],
+        "files_failed": status['files_failed'],
+        "cache_hits": metrics['cache']['hits'],
+        "cache_misses": metrics['cache']['misses'],
+        "bytes_in": metrics['bytes_in'],
+        "bytes_written": metrics['bytes_out'],
+        "peak_rss_mb": round(self_rss / 1024, 1),
+        "peak_worker_rss_mb": round(children_rss / 1024, 1),
+        "stages": metrics['stages']
+    }))
+
+
+def git_commit() -> str:
+    """Current commit, if run from a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_table(results: Dict[str, Dict]):
+    """Print a summary table of the scenarios."""
+    stages = sorted({stage for result in results.values() for stage in result['stages']})
+    print(f"\n{'Scenario':<12} {'Wall (s)':>9} {'Updated':>8} {'Written (MB)':>13} "
+          f"{'RSS (MB)':>9}  Stage busy time (s)")
+    print("-" * 100)
+    for name, result in results.items():
+        busy = ", ".join(
+            f"{stage} {result['stages'][stage]['seconds']:.2f}"
+            for stage in stages if stage in result['stages']
+        )
+        rss = max(result['peak_rss_mb'], result['peak_worker_rss_mb'])
+        print(f"{name:<12} {result['wall_seconds']:>9.2f} {result['files_updated']:>8} "
+              f"{result['bytes_written'] / 1024 / 1024:>13.1f} {rss:>9.1f}  {busy}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the gallery sync pipeline against a local source")
+    parser.add_argument("--images", type=int, default=50, help="Synthetic originals to generate")
+    parser.add_argument("--size", default="2016x1512", help="Original image size (WxH)")
+    parser.add_argument("--categories", default="drywall,deck,electrical,bathroom,painting",
+                        help="Comma-separated category folders")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="Scenarios to run, in order")
+    parser.add_argument("--changed", type=float, default=0.1,
+                        help="Fraction of originals edited (and added) for the incremental run")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated seconds per source request")
+    parser.add_argument("--workdir", help="Keep the photo set and outputs here (default: temp dir)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(Path(args.worker))
+        return
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    categories = [c.strip() for c in args.categories.split(',') if c.strip()]
+    width, height = (int(v) for v in args.size.split('x'))
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-sync-') as tmp:
+        workdir = Path(args.workdir or tmp).resolve()
+        source = workdir / 'source'
+        gallery = workdir / 'docs' / 'gallery' / 'images'
+
+        if not source.exists():
+            print(f"🖼️  Generating {args.images} synthetic {width}x{height} photos...")
+            generate_photos(source, categories, args.images, width, height)
+
+        env = {
+            'GALLERY_SOURCE': str(source),
+            'GALLERY_CACHE_DIR': str(workdir / 'cache'),
+            'GALLERY_CHECKPOINT': str(workdir / 'checkpoint.jsonl'),
+            'GALLERY_SIMULATE_LATENCY': str(args.latency),
+            'FORCE_SYNC': 'false'
+        }
+
+        results = {}
+        for scenario in scenarios:
+            if scenario == 'cold':
+                shutil.rmtree(gallery, ignore_errors=True)
+                shutil.rmtree(workdir / 'cache', ignore_errors=True)
+            elif scenario == 'warm':
+                shutil.rmtree(gallery, ignore_errors=True)
+            elif scenario == 'incremental':
+                edited = edit_photos(source, args.changed, seed=len(results))
+                added = max(1, int(args.images * args.changed))
+                generate_photos(source, categories, added, width, height,
+                                start=len(list(source.glob('*/IMG_*.jpg'))))
+                print(f"✏️  Edited {edited} and added {added} originals")
+
+            print(f"⏱️  Running {scenario} sync...")
+            results[scenario] = run_scenario(workdir, env)
+
+        print_table(results)
+
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "cpu_count": os.cpu_count(),
+            "config": {
+                "images": args.images,
+                "size": f"{width}x{height}",
+                "categories": categories,
+                "changed": args.changed,
+                "latency": args.latency,
+                "concurrency": os.getenv('SYNC_CONCURRENCY', '4'),
+                "optimize_workers": os.getenv('SYNC_OPTIMIZE_WORKERS', str(os.cpu_count()))
+            },
+            "scenarios": results
+        }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,12 @@ import os
 import re
 import glob
 import json
+import argparse
 from pathlib import Path
 from datetime import datetime
 
+DOCS_DIR = Path(__file__).parent.parent / 'docs'
+
 def check_csp_in_file(file_path):
     """Check CSP implementation in an HTML file."""
     try:
@@ -121,9 +124,17 @@ def validate_csp_policy(directives):
 
     return issues, recommendations
 
+
+def csp_file_issues(result):
+    """Issues for one file's check_csp_in_file result, as shown in --watch."""
+    if not result['has_csp']:
+        return [f"No CSP found ({result['error']})" if 'error' in result else "No CSP found"]
+    issues, _ = validate_csp_policy(result['directives'])
+    return issues
+
 def generate_report():
     """Generate comprehensive CSP report."""
-    docs_dir = Path(__file__).parent.parent / 'docs'
+    docs_dir = DOCS_DIR
     html_files = glob.glob(str(docs_dir / '*.html'))
 
     report = {
@@ -207,5 +218,24 @@ def generate_report():
 
     return report
 
+
+def watch_files():
+    """Re-check files as they are saved, printing how their CSP issues changed."""
+    from file_watcher import watch
+
+    initial = {
+        Path(html_file): csp_file_issues(check_csp_in_file(html_file))
+        for html_file in glob.glob(str(DOCS_DIR / '*.html'))
+    }
+    watch(DOCS_DIR, lambda path: csp_file_issues(check_csp_in_file(path)), initial)
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Validate CSP implementation across docs/ HTML files")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the report, re-check files as they change")
+    args = parser.parse_args()
+
     generate_report()
+    if args.watch:
+        watch_files()
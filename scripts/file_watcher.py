@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+File Watcher - Shared --watch support for the docs/ checking tools
+Yields batches of changed files using filesystem notifications (watchdog,
+inotify on Linux) when installed, or by polling modification times.
+"""
+
+import time
+import queue
+import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Polling interval and the quiet period that groups an editor's burst of
+# writes (temp file, rename, touch) into a single batch
+POLL_INTERVAL = 0.05
+DEBOUNCE_SECONDS = 0.03
+
+
+class FileWatcher:
+    """Watch a directory for created, modified and deleted files matching a pattern."""
+
+    def __init__(self, directory: Path, pattern: str = "*.html", interval: float = POLL_INTERVAL):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.interval = interval
+        self.backend = "polling"
+        self._events: Optional[queue.Queue] = None
+        self._observer = None
+        self._snapshot = self._scan()
+
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return
+
+        events = queue.Queue()
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    events.put(event.src_path)
+                    if getattr(event, 'dest_path', None):
+                        events.put(event.dest_path)
+
+        observer = Observer()
+        observer.schedule(Handler(), str(self.directory), recursive=False)
+        observer.start()
+        self._events, self._observer = events, observer
+        self.backend = "notifications"
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for path in self.directory.glob(self.pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _changes_since_snapshot(
+            self, candidates: Optional[Set[Path]] = None) -> Tuple[Set[Path], Set[Path]]:
+        """Compare against the last snapshot, limited to ``candidates`` if given."""
+        if candidates is None:
+            current = self._scan()
+            candidates = set(current) | set(self._snapshot)
+        else:
+            current = dict(self._snapshot)
+            for path in candidates:
+                try:
+                    stat = path.stat()
+                    current[path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    current.pop(path, None)
+
+        changed = {
+            path for path in candidates
+            if path in current and current[path] != self._snapshot.get(path)
+        }
+        removed = {path for path in candidates if path in self._snapshot and path not in current}
+        self._snapshot = current
+        return changed, removed
+
+    def _next_notified(self) -> Set[Path]:
+        """Block until a matching path is notified, then drain the burst."""
+        paths: Set[Path] = set()
+        timeout = None
+        while True:
+            try:
+                raw = self._events.get(timeout=timeout)
+            except queue.Empty:
+                return paths
+            path = Path(raw)
+            if (path.parent.resolve() == self.directory.resolve()
+                    and fnmatch.fnmatch(path.name, self.pattern)):
+                paths.add(self.directory / path.name)
+            if paths:
+                timeout = DEBOUNCE_SECONDS
+
+    def changes(self) -> Iterator[Tuple[Set[Path], Set[Path]]]:
+        """Yield ``(changed, removed)`` path sets, forever."""
+        while True:
+            if self._observer:
+                changed, removed = self._changes_since_snapshot(self._next_notified())
+            else:
+                time.sleep(self.interval)
+                changed, removed = self._changes_since_snapshot()
+            if changed or removed:
+                yield changed, removed
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+
+
+def print_issue_diff(name: str, before: List[str], after: List[str], elapsed: float):
+    """Print which issues appeared and which were fixed since the last check."""
+    added = [issue for issue in after if issue not in before]
+    fixed = [issue for issue in before if issue not in after]
+    print(f"🔄 {name} ({elapsed * 1000:.0f} ms) - {len(after)} issues")
+    for issue in added:
+        print(f"    ➕ {issue}")
+    for issue in fixed:
+        print(f"    ✅ Fixed: {issue}")
+    if not added and not fixed:
+        print("    ➖ No change in issues")
+
+
+def watch(directory: Path, check: Callable[[Path], List[str]], initial: Dict[Path, List[str]],
+          pattern: str = "*.html"):
+    """Re-run ``check`` on each changed file until interrupted.
+
+    ``initial`` maps every file to its issues from the first full pass;
+    it is kept up to date so each change is diffed against the last check.
+    """
+    state = dict(initial)
+    watcher = FileWatcher(directory, pattern)
+    print(f"\n👀 Watching {directory}/{pattern} ({watcher.backend}) - Ctrl+C to stop")
+    try:
+        for changed, removed in watcher.changes():
+            for path in sorted(removed):
+                cleared = state.pop(path, [])
+                print(f"🗑️  {path.name} removed ({len(cleared)} issues cleared)")
+            for path in sorted(changed):
+                start = time.perf_counter()
+                try:
+                    issues = check(path)
+                except Exception as e:
+                    print(f"❌ Error checking {path.name}: {e}")
+                    continue
+                elapsed = time.perf_counter() - start
+                print_issue_diff(path.name, state.get(path, []), issues, elapsed)
+                state[path] = issues
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.stop()
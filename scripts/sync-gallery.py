@@ -7,20 +7,37 @@ organizes them into the static gallery directory structure.
 
 import os
 import sys
+import base64
 import json
 import hashlib
+import heapq
+import mimetypes
+import queue
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import logging
 
 # Google Drive API
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload
+import httplib2
 
 # Image processing
-from PIL import Image
+from PIL import Image, ImageFilter, ImageOps
+import PIL
 import io
 import requests
 
@@ -28,39 +45,924 @@ import requests
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class GallerySync:
-    def __init__(self):
-        """Initialize the Gallery Sync with Google Drive API."""
-        self.service = self._authenticate()
-        self.gallery_base = Path('docs/gallery/images')
-        self.gallery_base.mkdir(parents=True, exist_ok=True)
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+IMAGE_MIME_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'image/jpg')
 
-        # Category mapping: Drive folder name -> Static folder name
-        self.categories = {
-            'drywall': 'drywall',
-            'deck': 'deck',
-            'electrical': 'electrical',
-            'bathroom': 'bathroom',
-            'painting': 'painting'
+# Drive listing: largest page size files.list allows, and how many folders
+# are combined into one "in parents" query
+LIST_PAGE_SIZE = 1000
+LIST_PARENTS_PER_QUERY = 20
+
+# Image.reduce keeps at least this multiple of the largest output width
+# before the final LANCZOS pass (same gap Pillow's thumbnail() uses)
+REDUCING_GAP = 2.0
+EXIF_ORIENTATION = 0x0112
+
+# Extension for each output format; JPEG is always written as the fallback
+FORMAT_EXTENSIONS = {'JPEG': '.jpg', 'WEBP': '.webp', 'AVIF': '.avif'}
+
+# Extensions of files the sync writes; only these are candidates for cleanup
+OUTPUT_EXTENSIONS = ('.jpg', '.webp', '.avif')
+
+# Seconds between manifest checkpoints during a run, and how old an
+# interrupted run's checkpoint may be and still be resumed (well past the
+# daily cron, so the next scheduled run picks up a killed one)
+CHECKPOINT_INTERVAL = 30
+CHECKPOINT_MAX_AGE = 7 * 24 * 3600
+
+# Drive request retries: attempts, backoff base/cap (seconds), and the
+# HTTP statuses / 403 reasons that are worth retrying
+RETRY_ATTEMPTS = 6
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 64.0
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RETRYABLE_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'backendError'}
+
+# Low-quality image placeholder: width in pixels and blur radius
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_BLUR = 1
+
+# Per-category index of synced images for the gallery page
+GALLERY_INDEX_NAME = 'gallery-index.json'
+
+# Perceptual hash: dHash of a 9x8 grayscale thumbnail (64 bits), decoded
+# in JPEG draft mode at this size or larger
+DHASH_SIZE = 8
+DHASH_DRAFT_SIZE = 64
+
+# Bytes fetched per request when streaming an original to disk
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Process umask, read once at import (os.umask can only be read by setting it)
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def variant_suffix(width: int, main_width: int) -> str:
+    """Filename suffix for a responsive variant; the main image has none."""
+    return "" if width == main_width else f"-{width}w"
+
+
+def encoder_available(image_format: str) -> bool:
+    """Check whether the local Pillow build (or a loaded plugin such as
+    pillow-avif-plugin) can write a format."""
+    Image.init()
+    return image_format in Image.SAVE
+
+
+def encode_image(img: Image.Image, image_format: str, quality: int) -> bytes:
+    """Encode an image in memory."""
+    output = io.BytesIO()
+    if image_format == 'JPEG':
+        img.save(output, format='JPEG', quality=quality, optimize=True)
+    elif image_format == 'WEBP':
+        img.save(output, format='WEBP', quality=quality, method=6)
+    else:
+        img.save(output, format=image_format, quality=quality)
+    return output.getvalue()
+
+
+def display_width(img: Image.Image) -> int:
+    """Width of an image once its EXIF orientation is applied."""
+    rotated = img.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8)
+    return img.height if rotated else img.width
+
+
+def decode_for_width(img: Image.Image, target_width: int) -> Image.Image:
+    """Decode an image upright and only as large as ``target_width`` needs.
+
+    JPEGs are decoded with draft mode, whose DCT scaling never goes below
+    the target size, and anything still more than ``REDUCING_GAP`` times the
+    target is box-reduced with ``Image.reduce`` before the final high-quality
+    resample.
+    EXIF orientation is applied on the reduced image, so rotated phone
+    photos need no separate full-size transform.
+    """
+    scale = target_width / display_width(img)
+    if img.format == 'JPEG' and scale < 1:
+        img.draft(None, (int(img.width * scale), int(img.height * scale)))
+
+    img = ImageOps.exif_transpose(img)
+
+    factor = int(img.width // (target_width * REDUCING_GAP))
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img
+
+
+def placeholder_data_uri(img: Image.Image) -> str:
+    """Tiny blurred copy of an image as a data URI, shown while it loads."""
+    height = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+    tiny = img.resize((PLACEHOLDER_WIDTH, height), Image.Resampling.BOX)
+    tiny = tiny.filter(ImageFilter.GaussianBlur(PLACEHOLDER_BLUR))
+    if encoder_available('WEBP'):
+        mime, data = 'image/webp', encode_image(tiny, 'WEBP', 40)
+    else:
+        mime, data = 'image/jpeg', encode_image(tiny, 'JPEG', 40)
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def perceptual_hash(source: Union[str, bytes]) -> Optional[str]:
+    """64-bit difference hash (dHash) of an image as 16 hex digits.
+
+    Compares the brightness of horizontally adjacent pixels in an upright
+    9x8 grayscale thumbnail, so recompressed, resized or slightly cropped
+    copies of a photo hash within a few bits of each other. JPEGs are
+    decoded in draft mode, which makes this far cheaper than optimizing.
+    Returns None if the image cannot be decoded.
+    """
+    try:
+        with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as img:
+            if img.format == 'JPEG':
+                img.draft('L', (DHASH_DRAFT_SIZE, DHASH_DRAFT_SIZE))
+            img = ImageOps.exif_transpose(img).convert('L')
+            img = img.resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.LANCZOS)
+            # One byte per pixel in mode L
+            pixels = img.tobytes()
+    except Exception as e:
+        logger.error(f"Error hashing image: {e}")
+        return None
+
+    bits = 0
+    for row in range(DHASH_SIZE):
+        for col in range(DHASH_SIZE):
+            left = pixels[row * (DHASH_SIZE + 1) + col]
+            right = pixels[row * (DHASH_SIZE + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:016x}"
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def optimize_image_data(source: Union[str, bytes], max_width: int = 1200, quality: int = 85,
+                        widths: Iterable[int] = (), formats: Iterable[Tuple[str, int]] = (),
+                        timings: Optional[Dict[str, float]] = None) -> List[Dict]:
+    """Optimize an image into the main gallery JPEG plus responsive variants.
+
+    ``source`` is a file path (streamed downloads) or raw bytes. The image is
+    decoded once, reduced on load (see ``decode_for_width``); variants are
+    produced largest first, each resized from the previous one. The main
+    output is capped at ``max_width``; ``widths`` adds srcset variants,
+    skipping any wider than the original. Every size is
+    written as JPEG, and additionally in each of ``formats`` (format,
+    quality) when that encoding is smaller than the JPEG. Returns one dict
+    per output with ``suffix``, ``format``, ``width``, ``height`` and
+    ``data``, or an empty list if the image cannot be decoded; the main
+    JPEG also carries a ``placeholder`` data URI made from the smallest size.
+    Module-level so it can run on the optimize process pool. Seconds spent decoding,
+    resizing and encoding are added to ``timings`` if given.
+    """
+    if timings is None:
+        timings = {}
+    for stage in ('decode', 'resize', 'encode'):
+        timings.setdefault(stage, 0.0)
+
+    try:
+        with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as img:
+            # Output widths, based on the upright (display) width
+            width = display_width(img)
+            # Originals narrower than max_width keep their own width as the main size
+            main_width = min(max_width, width)
+            targets = {main_width}
+            targets.update(w for w in widths if w < width)
+
+            start = time.perf_counter()
+            current = decode_for_width(img, max(targets))
+
+            # Convert to RGB if needed (for JPEG)
+            if current.mode not in ('RGB', 'L'):
+                current = current.convert('RGB')
+            current.load()
+            timings['decode'] += time.perf_counter() - start
+
+            outputs = []
+            for width in sorted(targets, reverse=True):
+                # Resize if needed, starting from the previous (larger) variant
+                start = time.perf_counter()
+                if current.width > width:
+                    new_height = max(1, round(current.height * width / current.width))
+                    current = current.resize((width, new_height), Image.Resampling.LANCZOS)
+                timings['resize'] += time.perf_counter() - start
+
+                # Save optimized, keeping other formats only when they win
+                start = time.perf_counter()
+                suffix = variant_suffix(width, main_width)
+                jpeg_data = encode_image(current, 'JPEG', quality)
+                encoded = [('JPEG', jpeg_data)]
+                for image_format, format_quality in formats:
+                    data = encode_image(current, image_format, format_quality)
+                    if len(data) < len(jpeg_data):
+                        encoded.append((image_format, data))
+                timings['encode'] += time.perf_counter() - start
+
+                for image_format, data in encoded:
+                    outputs.append({
+                        "suffix": suffix,
+                        "format": image_format,
+                        "width": current.width,
+                        "height": current.height,
+                        "data": data
+                    })
+
+            # Made from the smallest size, already in memory
+            main_output = next(o for o in outputs if not o['suffix'] and o['format'] == 'JPEG')
+            main_output['placeholder'] = placeholder_data_uri(current)
+            return outputs
+    except Exception as e:
+        logger.error(f"Error optimizing image: {e}")
+        return []
+
+
+def optimize_image_timed(*args) -> Tuple[List[Dict], Dict[str, float]]:
+    """``optimize_image_data`` plus its stage timings, for the process pool."""
+    timings: Dict[str, float] = {}
+    return optimize_image_data(*args, timings=timings), timings
+
+
+class SyncMetrics:
+    """Thread-safe run metrics: time spent and items handled per pipeline
+    stage, byte counters and the slowest files.
+
+    Stages overlap (downloads, optimize workers and the writer all run at
+    once), so stage times are busy times, not shares of the wall time.
+    """
+
+    def __init__(self, slowest: int = 5):
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.bytes: Dict[str, int] = {}
+        self.slowest = slowest
+        self._files: List[Tuple[float, str, str]] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, count: int = 1):
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + count
+
+    @contextmanager
+    def time(self, stage: str, count: int = 1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, count)
+
+    def add_bytes(self, counter: str, amount: int):
+        with self._lock:
+            self.bytes[counter] = self.bytes.get(counter, 0) + amount
+
+    def file_time(self, name: str, category: str, seconds: float):
+        """Track a file's processing time, keeping only the slowest few."""
+        with self._lock:
+            heapq.heappush(self._files, (seconds, category, name))
+            if len(self._files) > self.slowest:
+                heapq.heappop(self._files)
+
+    def stages(self) -> Dict[str, Dict]:
+        """``{stage: {seconds, count, per_second}}``."""
+        with self._lock:
+            return {
+                stage: {
+                    "seconds": round(seconds, 3),
+                    "count": self.counts[stage],
+                    "per_second": round(self.counts[stage] / seconds, 1) if seconds else None
+                }
+                for stage, seconds in self.seconds.items()
+            }
+
+    def slowest_files(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {"name": name, "category": category, "seconds": round(seconds, 3)}
+                for seconds, category, name in sorted(self._files, reverse=True)
+            ]
+
+
+class DuplicateIndex:
+    """BK-tree of perceptual hashes for finding near-duplicate images.
+
+    Lookups only descend into subtrees whose edge distance is within
+    ``threshold`` of the query's distance to the node (triangle
+    inequality), so matching stays well below a scan of every hash.
+    """
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        # Node: [hash, [(file_id, name), ...], {distance: child node}]
+        self.root: Optional[list] = None
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def add(self, file_id: str, name: str, phash: str):
+        with self._lock:
+            self._add(int(phash, 16), (file_id, name))
+
+    def _add(self, value: int, item: Tuple[str, str]):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def find(self, phash: str, exclude: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """Closest indexed (file_id, name) within the threshold, if any."""
+        with self._lock:
+            return self._find(int(phash, 16), exclude)
+
+    def _find(self, value: int, exclude: Optional[str]) -> Optional[Tuple[str, str]]:
+        best, best_distance = None, self.threshold + 1
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance < best_distance:
+                match = next((item for item in node[1] if item[0] != exclude), None)
+                if match is not None:
+                    best, best_distance = match, distance
+            for edge, child in node[2].items():
+                if distance - self.threshold <= edge <= distance + self.threshold:
+                    stack.append(child)
+        return best
+
+    def match_or_add(self, file_id: str, name: str, phash: str) -> Optional[Tuple[str, str]]:
+        """Return the near-duplicate of a new image, or index it as an original."""
+        with self._lock:
+            value = int(phash, 16)
+            match = self._find(value, file_id)
+            if match is None:
+                self._add(value, (file_id, name))
+            return match
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every Drive request."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying a failed Drive call, or None to give up.
+
+    Honors ``Retry-After`` when Drive sends one; otherwise uses exponential
+    backoff with full jitter.
+    """
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        reasons = {d.get('reason') for d in (error.error_details or []) if isinstance(d, dict)}
+        if status not in RETRYABLE_STATUSES and not (status == 403 and reasons & RETRYABLE_REASONS):
+            return None
+        retry_after = error.resp.get('retry-after')
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    elif not isinstance(error, (OSError, httplib2.HttpLib2Error)):
+        return None
+
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write a file via a temp file in the same directory and an atomic rename.
+
+    A killed run leaves either the old file or the new one, never a partial
+    write. Stray ``.tmp-`` files are removed by the cleanup stage.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        # mkstemp creates the file 0600; give it the usual permissions
+        os.fchmod(fd, 0o666 & ~UMASK)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: Path, data, **kwargs):
+    """Serialize JSON and write it atomically."""
+    atomic_write(path, json.dumps(data, **kwargs).encode())
+
+
+class HashingWriter:
+    """File wrapper that hashes bytes as they are written."""
+
+    def __init__(self, fd: BinaryIO):
+        self.fd = fd
+        self.md5 = hashlib.md5()
+        self.bytes_written = 0
+
+    def write(self, chunk: bytes) -> int:
+        self.md5.update(chunk)
+        self.bytes_written += len(chunk)
+        return self.fd.write(chunk)
+
+
+class OutputCache:
+    """Content-addressed cache of optimizer outputs.
+
+    Entries are keyed by the source content hash plus a fingerprint of the
+    optimizer settings, so re-runs, FORCE_SYNC, Drive renames and moves
+    between categories reuse encoded outputs instead of re-running Pillow.
+    Each entry is a directory holding ``outputs.json`` and one file per
+    output; the least recently used entries are evicted once the cache
+    exceeds ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, fingerprint: str):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, source_hash: str) -> str:
+        """Cache key for a source content hash under the current settings."""
+        return hashlib.sha256(f"{source_hash}:{self.fingerprint}".encode()).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Load cached outputs, marking the entry as recently used."""
+        if not self.enabled:
+            return None
+
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(entry_dir / 'outputs.json', 'r') as f:
+                outputs = json.load(f)
+            for output in outputs:
+                with open(entry_dir / output.pop('file'), 'rb') as f:
+                    output['data'] = f.read()
+            os.utime(entry_dir)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return outputs
+
+    def put(self, key: str, outputs: List[Dict]):
+        """Store outputs, publishing the entry with an atomic rename."""
+        if not self.enabled:
+            return
+
+        entry_dir = self._entry_dir(key)
+        entry_dir.parent.mkdir(exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=entry_dir.parent, prefix='.tmp-'))
+        try:
+            index = []
+            for i, output in enumerate(outputs):
+                name = f"{i}{FORMAT_EXTENSIONS[output['format']]}"
+                with open(staging / name, 'wb') as f:
+                    f.write(output['data'])
+                index.append({k: v for k, v in output.items() if k != 'data'} | {"file": name})
+            with open(staging / 'outputs.json', 'w') as f:
+                json.dump(index, f)
+            os.replace(staging, entry_dir)
+        except OSError as e:
+            # Another worker stored the same key first, or the disk is full
+            logger.debug(f"Could not cache {key}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        if not self.enabled:
+            return
+
+        entries = []
+        total = 0
+        for shard in self.cache_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            for entry_dir in shard.iterdir():
+                if entry_dir.name.startswith('.tmp-'):
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    continue
+                size = sum(f.stat().st_size for f in entry_dir.iterdir())
+                entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+                total += size
+
+        evicted = 0
+        for _, size, entry_dir in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            evicted += 1
+
+        if evicted:
+            logger.info(f"Evicted {evicted} cache entries ({total / 1024 / 1024:.1f} MB remaining)")
+
+
+class SyncManifest:
+    """Persisted record of each synced Drive file and the output it produced.
+
+    Maps Drive file id -> modifiedTime, size, md5Checksum, output path
+    (relative to the gallery directory) and output hash, so unchanged files
+    can be skipped before they are downloaded.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        # Incremental sync state: Drive changes page token plus the folder
+        # layout it was taken against
+        self.changes_page_token: Optional[str] = None
+        self.root_folder_id: Optional[str] = None
+        self.folders: Dict[str, str] = {}
+        # Files that failed last run (id -> category and Drive metadata),
+        # re-queued by the next incremental sync
+        self.retry: Dict[str, Dict] = {}
+        # Optimizer settings fingerprint stamped on each entry; entries made
+        # with other settings count as changed
+        self.fingerprint: Optional[str] = None
+        # Every output path the sync has written; cleanup only removes paths
+        # from this set, never files it did not create
+        self.written: set = set()
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the manifest from disk, starting empty if it is missing or unreadable."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.files = data.get('files', {})
+                self.changes_page_token = data.get('changes_page_token')
+                self.root_folder_id = data.get('root_folder_id')
+                self.folders = data.get('folders', {})
+                self.retry = data.get('retry', {})
+                # Manifests from before ``written`` was kept: every output
+                # they list was written by the sync
+                self.written = set(data.get('written', [
+                    path for entry in self.files.values() for path in self.output_paths(entry)
+                ]))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+
+    def save(self):
+        """Write the manifest to disk."""
+        with self._lock:
+            data = {
+                "version": self.VERSION,
+                "changes_page_token": self.changes_page_token,
+                "root_folder_id": self.root_folder_id,
+                "folders": self.folders,
+                "retry": self.retry,
+                "written": sorted(self.written),
+                "files": self.files
+            }
+            atomic_write_json(self.path, data, indent=2, sort_keys=True)
+
+    def get(self, file_id: str) -> Optional[Dict]:
+        """Return the manifest entry for a Drive file id, if any."""
+        with self._lock:
+            return self.files.get(file_id)
+
+    def remove(self, file_id: str) -> Optional[Dict]:
+        """Forget a Drive file, returning its old entry."""
+        with self._lock:
+            return self.files.pop(file_id, None)
+
+    def restore(self, entries: Dict[str, Dict]):
+        """Put back entries recorded by an interrupted run's checkpoint."""
+        with self._lock:
+            self.files.update(entries)
+            for entry in entries.values():
+                self.written.update(self.output_paths(entry))
+
+    @staticmethod
+    def output_paths(entry: Dict) -> List[str]:
+        """Main output path of an entry followed by its variants'."""
+        return [entry['output_path']] + [v['path'] for v in entry.get('variants', [])]
+
+    def forget_written(self, paths: Iterable[str]):
+        """Stop tracking outputs that cleanup has removed."""
+        with self._lock:
+            self.written.difference_update(paths)
+
+    def settings_changed(self) -> bool:
+        """Whether any entry was made with other optimizer settings."""
+        with self._lock:
+            return any(entry.get('settings') != self.fingerprint for entry in self.files.values())
+
+    def expected_outputs(self) -> Dict[str, set]:
+        """Every output path (all variants and formats) grouped by the
+        category directory it is in.
+
+        Grouped by path rather than ``entry['category']``: a skipped
+        duplicate points at its original's files in another category.
+        """
+        expected: Dict[str, set] = {}
+        with self._lock:
+            for entry in self.files.values():
+                for path in self.output_paths(entry):
+                    expected.setdefault(path.split('/')[0], set()).add(path)
+        return expected
+
+    def prune(self, categories: Iterable[str], seen_ids: set) -> int:
+        """Forget files in ``categories`` that were not seen in a full listing."""
+        categories = set(categories)
+        with self._lock:
+            stale = [
+                file_id for file_id, entry in self.files.items()
+                if entry['category'] in categories and file_id not in seen_ids
+            ]
+            for file_id in stale:
+                del self.files[file_id]
+        return len(stale)
+
+    def is_unchanged(self, image: Dict, gallery_base: Path) -> bool:
+        """Check Drive metadata against the manifest without downloading."""
+        entry = self.get(image['id'])
+        if not entry:
+            return False
+
+        for key in ('modifiedTime', 'size', 'md5Checksum'):
+            if entry.get(key) != image.get(key):
+                return False
+        if entry.get('settings') != self.fingerprint:
+            return False
+
+        return self.outputs_exist(image['id'], gallery_base)
+
+    def outputs_exist(self, file_id: str, gallery_base: Path) -> bool:
+        """Check that every output recorded for a file is on disk."""
+        entry = self.get(file_id)
+        if not entry:
+            return False
+        return all((gallery_base / path).exists() for path in self.output_paths(entry))
+
+    def record(self, image: Dict, category: str, output_path: str, output_hash: str,
+               variants: Optional[List[Dict]] = None, dhash: Optional[str] = None,
+               duplicate_of: Optional[str] = None, placeholder: Optional[str] = None):
+        """Record a successfully synced Drive file.
+
+        ``variants`` lists every output (path, format, width, height, bytes)
+        for building ``<picture>`` sources and srcset attributes. ``dhash``
+        is the perceptual hash, ``duplicate_of`` the Drive file id of the
+        image this one is a near-duplicate of, and ``placeholder`` a tiny
+        blurred data URI for lazy loading.
+        """
+        entry = {
+            "name": image['name'],
+            "category": category,
+            "modifiedTime": image.get('modifiedTime'),
+            "size": image.get('size'),
+            "md5Checksum": image.get('md5Checksum'),
+            "output_path": output_path,
+            "output_hash": output_hash,
+            "variants": variants or [],
+            "settings": self.fingerprint
         }
+        if dhash:
+            entry["dhash"] = dhash
+        if duplicate_of:
+            entry["duplicate_of"] = duplicate_of
+        if placeholder:
+            entry["placeholder"] = placeholder
+        with self._lock:
+            self.files[image['id']] = entry
+            self.written.update(self.output_paths(entry))
 
-        # Force sync from environment variable
-        self.force_sync = os.getenv('FORCE_SYNC', 'false').lower() == 'true'
+
+class SyncCheckpoint:
+    """Append-only log of a full sync run, used to resume after a crash.
+
+    The first line records the run (start time, changes token, category
+    folders), followed by one line per listed image, a ``listed`` marker
+    once the listing is complete, and a ``done`` line per file written. A
+    restarted run replays the listing instead of querying Drive, restores the
+    manifest entries of files already done and skips them. The file is deleted when a run finishes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self, root_folder_id: str) -> Optional[Dict]:
+        """Load a resumable checkpoint for this root folder, if there is one."""
+        if not self.path.exists():
+            return None
+
+        state = {"entries": [], "done": {}, "listed": False}
+        try:
+            with open(self.path, 'r') as f:
+                header = json.loads(f.readline())
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn final line from a killed run
+                    if 'entry' in record:
+                        state['entries'].append((record['category'], record['entry']))
+                    elif 'done' in record:
+                        state['done'][record['done']] = record['manifest']
+                    elif record.get('listed'):
+                        state['listed'] = True
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+
+        started = datetime.fromisoformat(header['started_at'])
+        age = (datetime.now(timezone.utc) - started).total_seconds()
+        if (header.get('root_folder_id') != root_folder_id or age > CHECKPOINT_MAX_AGE
+                or not state['listed']):
+            return None
+
+        state.update(header)
+        return state
+
+    def start(self, header: Dict):
+        """Begin a new checkpoint, replacing any previous one."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w')
+        self._append(dict(header, started_at=datetime.now(timezone.utc).isoformat()))
+
+    def reopen(self):
+        """Keep appending to the checkpoint being resumed."""
+        self._file = open(self.path, 'a')
+
+    def _append(self, record: Dict):
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def add_entry(self, category: str, image: Dict):
+        self._append({"category": category, "entry": image})
+
+    def mark_listed(self):
+        self._append({"listed": True})
+
+    def mark_done(self, file_id: str, manifest_entry: Dict):
+        self._append({"done": file_id, "manifest": manifest_entry})
+
+    def finish(self):
+        """Close and delete the checkpoint after a completed run."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path.exists():
+            self.path.unlink()
+
+
+class Source(ABC):
+    """Where originals come from: category folders, their images and a
+    change feed, in the shape of Drive API ``files`` resources.
+
+    Backends implement the abstract methods, so an incomplete one fails
+    when it is constructed rather than mid-sync; the change feed is optional.
+
+    ``execute`` runs a request through the optional rate limiter and retries
+    transient errors with backoff; backends call it around each request.
+    """
+
+    name = "source"
+
+    def __init__(self, requests_per_second: float = 0, burst: int = 20):
+        self.rate_limiter = (
+            RateLimiter(requests_per_second, burst) if requests_per_second > 0 else None
+        )
+        self.retries = 0
+        self._retries_lock = threading.Lock()
+
+    def execute(self, call, description: str):
+        """Run a request, retrying transient errors.
+
+        ``call`` is a zero-argument callable such as ``request.execute``.
+        Raises the last error once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return call()
+            except Exception as e:
+                delay = retry_delay(e, attempt)
+                attempt += 1
+                if delay is None or attempt >= RETRY_ATTEMPTS:
+                    raise
+                with self._retries_lock:
+                    self.retries += 1
+                logger.warning(f"{description} failed ({e}); retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+    @abstractmethod
+    def root_folder_id(self) -> str:
+        """Id of the folder holding the category folders."""
+
+    @abstractmethod
+    def list_folders(self, parent_id: str) -> Iterator[Dict]:
+        """Yield ``{id, name}`` for each folder in a parent folder."""
+
+    @abstractmethod
+    def list_images(self, folder_ids: List[str]) -> Iterator[Dict]:
+        """Yield every image in the folders, ordered by name, with ``id,
+        name, modifiedTime, size, md5Checksum, parents``."""
+
+    def get_start_page_token(self) -> Optional[str]:
+        """Changes token for the current point in time, or None if the
+        source has no change feed."""
+        return None
+
+    def list_changes(self, page_token: str) -> Optional[Tuple[List[Dict], str]]:
+        """Changes since ``page_token`` and the next token, or None if the
+        token is no longer valid."""
+        return None
+
+    @abstractmethod
+    def download(self, file_id: str, file_name: str, writer: BinaryIO):
+        """Write the content of a file to ``writer``."""
+
+
+class DriveSource(Source):
+    """Google Drive, authenticated with a service account."""
+
+    name = "Google Drive"
+
+    def __init__(self):
+        # Drive allows ~200 requests/s per project
+        super().__init__(float(os.getenv('DRIVE_REQUESTS_PER_SECOND', '20')))
+        self.credentials = self._authenticate()
+        self._local = threading.local()
 
     def _authenticate(self):
         """Authenticate with Google Drive API using service account."""
         try:
             # Load service account credentials from file
-            creds = service_account.Credentials.from_service_account_file(
+            return service_account.Credentials.from_service_account_file(
                 'service-account.json',
                 scopes=['https://www.googleapis.com/auth/drive.readonly']
             )
-            return build('drive', 'v3', credentials=creds)
         except Exception as e:
             logger.error(f"Authentication failed: {e}")
             sys.exit(1)
 
-    def get_drive_folder_id(self) -> str:
+    @property
+    def service(self):
+        """Drive client for the calling thread (httplib2 is not thread-safe)."""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.credentials, cache_discovery=False)
+            self._local.service = service
+        return service
+
+    def root_folder_id(self) -> str:
         """Get the main Google Drive folder ID from environment."""
         folder_id = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
         if not folder_id:
@@ -68,16 +970,379 @@ class GallerySync:
             sys.exit(1)
         return folder_id
 
-    def list_folders(self, parent_id: str) -> Dict[str, str]:
-        """List all folders within a parent folder."""
+    def list_files(self, query: str, fields: str, order_by: Optional[str] = None) -> Iterator[Dict]:
+        """Yield every file matching a Drive query, following pagination.
+
+        ``fields`` is the per-file field list, e.g. ``"id, name"``.
+        """
+        page_token = None
+        while True:
+            request = self.service.files().list(
+                q=query,
+                fields=f"nextPageToken, files({fields})",
+                orderBy=order_by,
+                pageSize=LIST_PAGE_SIZE,
+                pageToken=page_token
+            )
+            results = self.execute(request.execute, "Listing files")
+
+            yield from results.get('files', [])
+
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return
+
+    def list_folders(self, parent_id: str) -> Iterator[Dict]:
+        return self.list_files(
+            f"'{parent_id}' in parents and mimeType='{FOLDER_MIME_TYPE}' and trashed=false",
+            "id, name"
+        )
+
+    def list_images(self, folder_ids: List[str]) -> Iterator[Dict]:
+        """Folders are combined into one ``'a' in parents or 'b' in parents``
+        query, so they are listed with one paginated request stream."""
+        # Query for common image types
+        mime_query = " or ".join([f"mimeType='{t}'" for t in IMAGE_MIME_TYPES])
+        parents_query = " or ".join([f"'{folder_id}' in parents" for folder_id in folder_ids])
+        return self.list_files(
+            f"({parents_query}) and ({mime_query}) and trashed=false",
+            "id, name, modifiedTime, size, md5Checksum, parents",
+            order_by="name"
+        )
+
+    def get_start_page_token(self) -> Optional[str]:
+        request = self.service.changes().getStartPageToken()
+        return self.execute(request.execute, "Getting start page token").get('startPageToken')
+
+    def list_changes(self, page_token: str) -> Optional[Tuple[List[Dict], str]]:
+        changes = []
+        try:
+            while page_token:
+                request = self.service.changes().list(
+                    pageToken=page_token,
+                    spaces='drive',
+                    pageSize=1000,
+                    includeRemoved=True,
+                    fields="nextPageToken, newStartPageToken, changes(fileId, removed, "
+                           "file(id, name, mimeType, modifiedTime, size, md5Checksum, "
+                           "parents, trashed))"
+                )
+                results = self.execute(request.execute, "Listing changes")
+                changes.extend(results.get('changes', []))
+                if 'newStartPageToken' in results:
+                    return changes, results['newStartPageToken']
+                page_token = results.get('nextPageToken')
+        except HttpError as e:
+            logger.warning(f"Changes page token rejected: {e}")
+        return None
+
+    def download(self, file_id: str, file_name: str, writer: BinaryIO):
+        request = self.service.files().get_media(fileId=file_id)
+        downloader = MediaIoBaseDownload(writer, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+
+        # A retried chunk resumes from the last completed byte range
+        done = False
+        while done is False:
+            _, done = self.execute(downloader.next_chunk, f"Downloading {file_name}")
+
+
+class LocalSource(Source):
+    """A local directory standing in for Drive, for offline runs and benchmarks.
+
+    Subdirectories of ``root`` are the category folders. Ids are derived from
+    relative paths, ``modifiedTime`` from mtimes and ``md5Checksum`` is
+    computed (and memoized per mtime/size). Change tokens are snapshots of
+    the tree saved under ``root/.changes``, so incremental syncs work too.
+    """
+
+    def __init__(self, root: Path):
+        super().__init__()
+        self.root = Path(root)
+        self.name = f"local directory {self.root}"
+        if not self.root.is_dir():
+            raise FileNotFoundError(f"Local source directory not found: {self.root}")
+        self._paths: Dict[str, Path] = {}
+        self._md5: Dict[Tuple[str, int, int], str] = {}
+        self._md5_lock = threading.Lock()
+
+    def file_id(self, path: Path) -> str:
+        relative = path.relative_to(self.root).as_posix()
+        file_id = 'local-' + hashlib.sha1(relative.encode()).hexdigest()[:16]
+        self._paths[file_id] = path
+        return file_id
+
+    def path_for(self, file_id: str) -> Path:
+        if file_id not in self._paths:
+            self.snapshot()
+        if file_id not in self._paths:
+            raise FileNotFoundError(f"No local file with id {file_id}")
+        return self._paths[file_id]
+
+    def resource(self, path: Path, stat: os.stat_result) -> Dict:
+        """Drive-style file resource for an image."""
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._md5_lock:
+            md5 = self._md5.get(key)
+        if md5 is None:
+            hash_md5 = hashlib.md5()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    hash_md5.update(chunk)
+            md5 = hash_md5.hexdigest()
+            with self._md5_lock:
+                self._md5[key] = md5
+
+        modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+        return {
+            "id": self.file_id(path),
+            "name": path.name,
+            "mimeType": mimetypes.guess_type(path.name)[0],
+            "modifiedTime": modified.isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            "size": str(stat.st_size),
+            "md5Checksum": md5,
+            "parents": [self.file_id(path.parent)]
+        }
+
+    def root_folder_id(self) -> str:
+        return self.file_id(self.root)
+
+    def category_dirs(self) -> List[Path]:
+        return sorted(p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith('.'))
+
+    def list_folders(self, parent_id: str) -> Iterator[Dict]:
+        if parent_id != self.root_folder_id():
+            return
+        for path in self.category_dirs():
+            yield {"id": self.file_id(path), "name": path.name}
+
+    def list_images(self, folder_ids: List[str]) -> Iterator[Dict]:
+        wanted = set(folder_ids)
+        images = []
+        for folder in self.category_dirs():
+            if self.file_id(folder) not in wanted:
+                continue
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and mimetypes.guess_type(entry.name)[0] in IMAGE_MIME_TYPES:
+                        images.append(self.resource(Path(entry.path), entry.stat()))
+        return iter(sorted(images, key=lambda image: image['name']))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Every category folder and image, keyed by id."""
+        files = {}
+        for folder in self.category_dirs():
+            files[self.file_id(folder)] = {
+                "id": self.file_id(folder), "name": folder.name,
+                "mimeType": FOLDER_MIME_TYPE, "parents": [self.root_folder_id()]
+            }
+            for image in self.list_images([self.file_id(folder)]):
+                files[image['id']] = image
+        return files
+
+    def get_start_page_token(self) -> Optional[str]:
+        token = str(time.time_ns())
+        changes_dir = self.root / '.changes'
+        changes_dir.mkdir(exist_ok=True)
+        atomic_write_json(changes_dir / f"{token}.json", self.snapshot())
+        return token
+
+    def list_changes(self, page_token: str) -> Optional[Tuple[List[Dict], str]]:
         try:
-            results = self.service.files().list(
-                q=f"'{parent_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false",
-                fields="files(id, name)"
-            ).execute()
+            with open(self.root / '.changes' / f"{page_token}.json") as f:
+                before = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        next_token = self.get_start_page_token()
+        with open(self.root / '.changes' / f"{next_token}.json") as f:
+            after = json.load(f)
+
+        changes = []
+        for file_id in before.keys() - after.keys():
+            changes.append({"fileId": file_id, "removed": True})
+        for file_id, file in after.items():
+            if before.get(file_id) != file:
+                changes.append({"fileId": file_id, "removed": False, "file": file})
+        return changes, next_token
+
+    def download(self, file_id: str, file_name: str, writer: BinaryIO):
+        with open(self.path_for(file_id), 'rb') as f:
+            shutil.copyfileobj(f, writer, DOWNLOAD_CHUNK_SIZE)
+
+
+class SimulatedSource(Source):
+    """Wraps another source, adding latency and transient failures per request.
+
+    Failures are raised before the wrapped request runs, so retrying them is
+    always safe; they go through the same backoff path as Drive errors.
+    """
+
+    def __init__(self, source: Source, latency: float = 0.0, failure_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        super().__init__()
+        self.source = source
+        self.name = f"{source.name} (simulated {latency}s latency, {failure_rate:.0%} failures)"
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def simulate(self):
+        with self._random_lock:
+            delay = self._random.uniform(0.5, 1.5) * self.latency
+            fail = self._random.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            raise ConnectionResetError("Simulated transient failure")
+
+    def request(self, call, description: str):
+        """Simulate the round trip (retrying injected failures), then run ``call``."""
+        self.execute(self.simulate, description)
+        return call()
+
+    def root_folder_id(self) -> str:
+        return self.source.root_folder_id()
+
+    def list_folders(self, parent_id: str) -> Iterator[Dict]:
+        return self.request(lambda: self.source.list_folders(parent_id), "Listing folders")
+
+    def list_images(self, folder_ids: List[str]) -> Iterator[Dict]:
+        return self.request(lambda: self.source.list_images(folder_ids), "Listing files")
 
+    def get_start_page_token(self) -> Optional[str]:
+        return self.request(self.source.get_start_page_token, "Getting start page token")
+
+    def list_changes(self, page_token: str) -> Optional[Tuple[List[Dict], str]]:
+        return self.request(lambda: self.source.list_changes(page_token), "Listing changes")
+
+    def download(self, file_id: str, file_name: str, writer: BinaryIO):
+        self.request(lambda: self.source.download(file_id, file_name, writer),
+                     f"Downloading {file_name}")
+
+
+def create_source() -> Source:
+    """Source selected by ``GALLERY_SOURCE``: ``drive`` (default) or a local
+    directory path. ``GALLERY_SIMULATE_LATENCY`` (seconds) and
+    ``GALLERY_SIMULATE_FAILURE_RATE`` (0-1) wrap it in a SimulatedSource."""
+    name = os.getenv('GALLERY_SOURCE', 'drive')
+    source = DriveSource() if name == 'drive' else LocalSource(Path(name))
+
+    latency = float(os.getenv('GALLERY_SIMULATE_LATENCY', '0'))
+    failure_rate = float(os.getenv('GALLERY_SIMULATE_FAILURE_RATE', '0'))
+    if latency or failure_rate:
+        seed = os.getenv('GALLERY_SIMULATE_SEED')
+        source = SimulatedSource(source, latency, failure_rate, int(seed) if seed else None)
+    return source
+
+
+class GallerySync:
+    def __init__(self, source: Optional[Source] = None):
+        """Initialize the Gallery Sync with Google Drive API (or ``source``)."""
+        self.source = source or create_source()
+        self.gallery_base = Path('docs/gallery/images')
+        self.gallery_base.mkdir(parents=True, exist_ok=True)
+        self.manifest = SyncManifest(self.gallery_base / 'sync-manifest.json')
+
+        # Category mapping: Drive folder name -> Static folder name
+        self.categories = {
+            'drywall': 'drywall',
+            'deck': 'deck',
+            'electrical': 'electrical',
+            'bathroom': 'bathroom',
+            'painting': 'painting'
+        }
+
+        # Force sync from environment variable
+        self.force_sync = os.getenv('FORCE_SYNC', 'false').lower() == 'true'
+
+        # Report orphaned images instead of deleting them
+        self.cleanup_dry_run = os.getenv('CLEANUP_DRY_RUN', 'false').lower() == 'true'
+
+        # Folder ids whose listing failed this run; cleanup is skipped if set
+        self.listing_errors: set = set()
+
+        # Near-duplicate handling: off, flag (record duplicate_of), skip
+        # (point at the original's outputs) or link (hard-link them)
+        self.duplicate_mode = os.getenv('DUPLICATE_MODE', 'flag').lower()
+        if self.duplicate_mode not in ('off', 'flag', 'skip', 'link'):
+            logger.warning(f"Unknown DUPLICATE_MODE {self.duplicate_mode}, using flag")
+            self.duplicate_mode = 'flag'
+        self.duplicates: Optional[DuplicateIndex] = None
+        self.duplicate_threshold = int(os.getenv('DUPLICATE_THRESHOLD', '8'))
+        self.duplicate_of: Dict[str, str] = {}
+        self.pending_duplicates: List[Tuple[str, Dict, Path, str, str]] = []
+
+        # Per-stage timings, byte counters and slowest files for this run
+        self.metrics = SyncMetrics()
+
+        # Files that failed to download/optimize/write this run (id -> category),
+        # with their Drive metadata so the next run can retry them
+        self.failed_files: Dict[str, str] = {}
+        self.failed_images: Dict[str, Dict] = {}
+        self._failed_lock = threading.Lock()
+
+        # Optimizer settings: main image size/quality and srcset widths
+        self.max_width = 1200
+        self.quality = 85
+        self.variant_widths = tuple(
+            int(w) for w in os.getenv('GALLERY_VARIANT_WIDTHS', '320,640,960,1200,1920').split(',')
+            if w.strip()
+        )
+
+        # Extra output formats written next to the JPEG, with their quality
+        format_quality = {
+            'WEBP': int(os.getenv('GALLERY_WEBP_QUALITY', '80')),
+            'AVIF': int(os.getenv('GALLERY_AVIF_QUALITY', '60'))
+        }
+        self.output_formats = []
+        for name in os.getenv('GALLERY_FORMATS', 'webp,avif').split(','):
+            image_format = name.strip().upper()
+            if not image_format:
+                continue
+            if image_format not in format_quality:
+                logger.warning(f"Unknown output format: {name}")
+            elif encoder_available(image_format):
+                self.output_formats.append((image_format, format_quality[image_format]))
+            else:
+                logger.info(f"{image_format} output not supported by this Pillow build, skipping")
+
+        # Encoded-output cache, keyed by source hash + the settings above
+        # and the Pillow version; the manifest re-syncs files recorded with
+        # other settings, but not on every (unpinned) Pillow upgrade
+        self.manifest.fingerprint = self.settings_fingerprint()
+        self.cache = OutputCache(
+            Path(os.getenv('GALLERY_CACHE_DIR', '.cache/gallery-sync')),
+            int(float(os.getenv('GALLERY_CACHE_MAX_MB', '1024')) * 1024 * 1024),
+            self.settings_fingerprint(pillow=True)
+        )
+
+        # Progress log for resuming an interrupted full sync
+        self.checkpoint = SyncCheckpoint(
+            Path(os.getenv('GALLERY_CHECKPOINT', '.cache/gallery-sync-checkpoint.jsonl'))
+        )
+
+        # Pipeline sizing: concurrent downloads, optimize processes and the
+        # number of images downloaded but not yet written before downloads
+        # block; enough to keep every optimize worker busy
+        self.concurrency = max(1, int(os.getenv('SYNC_CONCURRENCY', '4')))
+        self.optimize_workers = max(
+            1, int(os.getenv('SYNC_OPTIMIZE_WORKERS', str(os.cpu_count() or 1))))
+        self.max_in_flight = max(self.concurrency, self.optimize_workers) * 2
+        self._optimize_pool: Optional[ProcessPoolExecutor] = None
+
+    def get_root_folder_id(self) -> str:
+        """Get the id of the folder holding the category folders."""
+        return self.source.root_folder_id()
+
+    def list_folders(self, parent_id: str) -> Optional[Dict[str, str]]:
+        """List all folders within a parent folder.
+
+        Returns None if the listing failed, as opposed to an empty dict when
+        there are no category folders.
+        """
+        try:
             folders = {}
-            for folder in results.get('files', []):
+            for folder in self.source.list_folders(parent_id):
                 folder_name = folder['name'].lower()
                 if folder_name in self.categories:
                     folders[folder_name] = folder['id']
@@ -86,64 +1351,131 @@ class GallerySync:
             return folders
         except Exception as e:
             logger.error(f"Error listing folders: {e}")
-            return {}
+            return None
+
+    def iter_images(self, folder_ids: List[str]) -> Iterator[Dict]:
+        """Stream all images in several folders, listing them together.
+
+        Folders are listed up to LIST_PARENTS_PER_QUERY at a time. Results are
+        ordered by name and include ``parents``.
+        """
+        for start in range(0, len(folder_ids), LIST_PARENTS_PER_QUERY):
+            chunk = folder_ids[start:start + LIST_PARENTS_PER_QUERY]
+            try:
+                yield from self.source.list_images(chunk)
+            except Exception as e:
+                logger.error(f"Error listing images in folders {', '.join(chunk)}: {e}")
+                self.listing_errors.update(chunk)
 
     def list_images(self, folder_id: str) -> List[Dict]:
         """List all images in a folder."""
-        try:
-            # Query for common image types
-            image_types = ["'image/jpeg'", "'image/png'", "'image/webp'", "'image/jpg'"]
-            mime_query = " or ".join([f"mimeType={t}" for t in image_types])
+        return list(self.iter_images([folder_id]))
 
-            results = self.service.files().list(
-                q=f"'{folder_id}' in parents and ({mime_query}) and trashed=false",
-                fields="files(id, name, mimeType, modifiedTime, size)",
-                orderBy="name"
-            ).execute()
-
-            return results.get('files', [])
+    def get_start_page_token(self) -> Optional[str]:
+        """Get the changes token marking the current point in time."""
+        try:
+            return self.source.get_start_page_token()
         except Exception as e:
-            logger.error(f"Error listing images in folder {folder_id}: {e}")
-            return []
+            logger.error(f"Error getting changes start page token: {e}")
+            return None
 
-    def download_image(self, file_id: str, file_name: str) -> Optional[bytes]:
-        """Download an image from Google Drive."""
+    def list_changes(self, page_token: str) -> Optional[Tuple[List[Dict], str]]:
+        """List changes since a page token.
+
+        Returns the changes and the token to store for the next run, or None
+        if the token is no longer valid.
+        """
         try:
-            request = self.service.files().get_media(fileId=file_id)
-            downloaded = io.BytesIO()
-            downloader = MediaIoBaseDownload(downloaded, request)
+            return self.source.list_changes(page_token)
+        except Exception as e:
+            logger.error(f"Error listing changes: {e}")
+            return None
 
-            done = False
-            while done is False:
-                _, done = downloader.next_chunk()
+    def download_image(self, file_id: str, file_name: str, dest: BinaryIO) -> Optional[str]:
+        """Stream an image from the source into ``dest``.
 
-            downloaded.seek(0)
-            return downloaded.read()
+        Chunks go straight to the file and are hashed on the way, so the
+        original is never held in memory. Returns the MD5 of the content.
+        """
+        try:
+            writer = HashingWriter(dest)
+            self.source.download(file_id, file_name, writer)
+            dest.flush()
+            return writer.md5.hexdigest()
         except Exception as e:
             logger.error(f"Error downloading {file_name}: {e}")
             return None
 
-    def optimize_image(self, image_data: bytes, max_width: int = 1200, quality: int = 85) -> bytes:
-        """Optimize image size and quality."""
+    def settings_fingerprint(self, pillow: bool = False) -> str:
+        """Hash of the optimizer settings, plus the Pillow version if ``pillow``."""
+        settings = {
+            "max_width": self.max_width,
+            "quality": self.quality,
+            "widths": sorted(self.variant_widths),
+            "formats": sorted(self.output_formats),
+            "reducing_gap": REDUCING_GAP,
+            "placeholder": [PLACEHOLDER_WIDTH, PLACEHOLDER_BLUR]
+        }
+        if pillow:
+            settings["pillow"] = PIL.__version__
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        """Run ``fn`` on the optimize pool, or inline (as a finished future) without one."""
+        if self._optimize_pool is not None:
+            return self._optimize_pool.submit(fn, *args)
+        future: Future = Future()
         try:
-            with Image.open(io.BytesIO(image_data)) as img:
-                # Convert to RGB if needed (for JPEG)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-
-                # Resize if needed
-                if img.width > max_width:
-                    ratio = max_width / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-
-                # Save optimized
-                output = io.BytesIO()
-                img.save(output, format='JPEG', quality=quality, optimize=True)
-                return output.getvalue()
+            future.set_result(fn(*args))
         except Exception as e:
-            logger.error(f"Error optimizing image: {e}")
-            return image_data
+            future.set_exception(e)
+        return future
+
+    def optimize_image(self, source: Union[str, bytes]) -> Future:
+        """Start optimizing an image into the main output and its responsive
+        variants; the future resolves to the outputs."""
+        args = (source, self.max_width, self.quality, self.variant_widths,
+                tuple(self.output_formats))
+        start = time.perf_counter()
+        result: Future = Future()
+
+        def collect(future: Future):
+            # Timed including any wait for a free worker
+            self.metrics.add('optimize', time.perf_counter() - start)
+            try:
+                outputs, timings = future.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            for stage, seconds in timings.items():
+                self.metrics.add(stage, seconds)
+            result.set_result(outputs)
+
+        self._submit(optimize_image_timed, *args).add_done_callback(collect)
+        return result
+
+    def hash_image(self, source: Union[str, bytes]) -> Future:
+        """Start computing the perceptual hash of an image on the optimize pool."""
+        start = time.perf_counter()
+        future = self._submit(perceptual_hash, source)
+        future.add_done_callback(
+            lambda _: self.metrics.add('phash', time.perf_counter() - start))
+        return future
+
+    def start_optimize_pool(self):
+        """Start the optimize process pool.
+
+        Workers are forked up front, before any download threads exist.
+        """
+        if self._optimize_pool is None:
+            self._optimize_pool = ProcessPoolExecutor(max_workers=self.optimize_workers)
+            self._optimize_pool.submit(int).result()
+
+    def stop_optimize_pool(self):
+        """Shut down the optimize process pool."""
+        if self._optimize_pool is not None:
+            self._optimize_pool.shutdown()
+            self._optimize_pool = None
 
     def get_file_hash(self, file_path: Path) -> str:
         """Get MD5 hash of a file."""
@@ -173,117 +1505,866 @@ class GallerySync:
 
         return existing_hash != new_hash
 
-    def generate_filename(self, category: str, original_name: str, index: int) -> str:
-        """Generate standardized filename for gallery."""
+    def generate_filename(self, category: str, original_name: str, file_id: str) -> str:
+        """Generate standardized filename for gallery.
+
+        The suffix is derived from the Drive file id, so a file's name does
+        not depend on its position in the folder listing.
+        """
         # Clean the original name
         name_base = Path(original_name).stem
         name_clean = "".join(c for c in name_base if c.isalnum() or c in ('-', '_')).lower()
+        file_key = hashlib.sha1(file_id.encode()).hexdigest()[:8]
 
-        # Generate filename: category-description-index.jpg
+        # Generate filename: category-description-filekey.jpg
         if name_clean:
-            return f"{category}-{name_clean}-{index}.jpg"
+            return f"{category}-{name_clean}-{file_key}.jpg"
         else:
-            return f"{category}-project-{index}.jpg"
+            return f"{category}-project-{file_key}.jpg"
 
-    def sync_category(self, category: str, folder_id: str) -> int:
-        """Sync all images from a category folder."""
-        logger.info(f"Syncing category: {category}")
+    def output_path_for(self, category: str, image: Dict) -> Path:
+        """Local path for a Drive image, reusing the name recorded in the manifest."""
+        entry = self.manifest.get(image['id'])
+        if entry and entry['category'] == category and not entry.get('duplicate_of'):
+            return self.gallery_base / entry['output_path']
+        filename = self.generate_filename(category, image['name'], image['id'])
+        return self.gallery_base / category / filename
 
-        # Create category directory
-        category_dir = self.gallery_base / category
-        category_dir.mkdir(exist_ok=True)
+    def mark_failed(self, category: str, image: Dict):
+        """Record a file that could not be synced this run."""
+        with self._failed_lock:
+            self.failed_files[image['id']] = category
+            self.failed_images[image['id']] = {"category": category, "file": image}
 
-        # Get all images from Drive
-        images = self.list_images(folder_id)
-        updated_count = 0
+    def build_duplicate_index(self):
+        """Index the perceptual hashes of every synced original."""
+        self.duplicates = DuplicateIndex(self.duplicate_threshold)
+        for file_id, entry in list(self.manifest.files.items()):
+            if entry.get('dhash') and not entry.get('duplicate_of'):
+                self.duplicates.add(file_id, entry['name'], entry['dhash'])
 
-        for index, image in enumerate(images, 1):
-            logger.info(f"Processing: {image['name']}")
+    def check_duplicate(self, category: str, image: Dict, local_path: Path,
+                        phash: Optional[str]) -> bool:
+        """Look an image up in the duplicate index.
+
+        Returns True if the image is a near-duplicate to be skipped or linked
+        (after the run, see ``resolve_duplicates``) instead of written.
+        """
+        if not phash or self.duplicates is None:
+            return False
 
-            # Generate local filename
-            local_filename = self.generate_filename(category, image['name'], index)
-            local_path = category_dir / local_filename
+        match = self.duplicates.match_or_add(image['id'], image['name'], phash)
+        if match is None:
+            return False
 
-            # Download image
-            image_data = self.download_image(image['id'], image['name'])
-            if not image_data:
+        original_id, original_name = match
+        logger.info(f"Near-duplicate: {image['name']} ({category}) matches {original_name}")
+        with self._failed_lock:
+            self.duplicate_of[image['id']] = original_id
+            if self.duplicate_mode == 'flag':
+                return False
+            self.pending_duplicates.append((category, image, local_path, original_id, phash))
+        return True
+
+    def resolve_duplicates(self):
+        """Record skipped duplicates and hard-link linked ones.
+
+        Runs once every original has been written. A duplicate whose
+        original did not sync is marked failed and retried next run.
+        """
+        for category, image, local_path, original_id, phash in self.pending_duplicates:
+            original = self.manifest.get(original_id)
+            if not original or not self.manifest.outputs_exist(original_id, self.gallery_base):
+                logger.warning(
+                    f"Original of duplicate {image['name']} is missing; retrying next run")
+                self.mark_failed(category, image)
                 continue
 
-            # Optimize image
-            optimized_data = self.optimize_image(image_data)
+            output_path, variants = original['output_path'], original['variants']
+            if self.duplicate_mode == 'link':
+                try:
+                    output_path, variants = self.link_outputs(original, local_path)
+                except OSError as e:
+                    logger.error(f"Error linking {local_path}: {e}")
+                    self.mark_failed(category, image)
+                    continue
+
+            self.manifest.record(
+                image, category, output_path, original['output_hash'], variants,
+                dhash=phash, duplicate_of=original_id, placeholder=original.get('placeholder')
+            )
+            self.checkpoint.mark_done(image['id'], self.manifest.get(image['id']))
+        self.pending_duplicates = []
+
+    def link_outputs(self, original: Dict, local_path: Path) -> Tuple[str, List[Dict]]:
+        """Hard-link an original's outputs under a duplicate's filename
+        (copying where links are not supported)."""
+        original_stem = Path(original['output_path']).stem
+        variants = []
+        for variant in original['variants']:
+            source = self.gallery_base / variant['path']
+            dest = local_path.with_name(local_path.stem + source.name[len(original_stem):])
+            if dest.exists():
+                dest.unlink()
+            try:
+                os.link(source, dest)
+            except OSError:
+                shutil.copyfile(source, dest)
+            variants.append({**variant, "path": dest.relative_to(self.gallery_base).as_posix()})
+        return local_path.relative_to(self.gallery_base).as_posix(), variants
+
+    def _fetch_stage(self, category: str, image: Dict, local_path: Path, work_dir: str,
+                     finish: Callable[[Optional[Tuple]], None]):
+        """Download one image and hand it to the optimize pool.
+
+        Returns as soon as the work is submitted, so the download thread
+        moves on while Pillow runs; hashing, the duplicate check and
+        optimizing continue in future callbacks. ``finish`` is called once,
+        with the write-stage item or None if the image was skipped or failed.
+        """
+        start = time.perf_counter()
+        download_path = None
+
+        def done(item: Optional[Tuple] = None):
+            if download_path:
+                try:
+                    os.unlink(download_path)
+                except OSError:
+                    pass
+            if item:
+                self.metrics.file_time(image['name'], category, time.perf_counter() - start)
+            finish(item)
+
+        def failed(e: Optional[Exception] = None):
+            if e:
+                logger.error(f"Error processing {image['name']}: {e}")
+            self.mark_failed(category, image)
+            done()
 
-            # Check if update needed
-            if self.should_update_file(local_path, optimized_data):
-                # Save optimized image
-                with open(local_path, 'wb') as f:
-                    f.write(optimized_data)
+        def then(future: Future, callback: Callable):
+            """Continue with a future's result; any error fails the image."""
+            def run(future: Future):
+                try:
+                    callback(future.result())
+                except Exception as e:
+                    failed(e)
+            future.add_done_callback(run)
+
+        def cached(outputs: List[Dict], phash: Optional[str]):
+            if self.check_duplicate(category, image, local_path, phash):
+                return done()
+            done((category, image, local_path, outputs, phash, None))
+
+        def hashed(phash: Optional[str], cache_key: str, source_bytes: int):
+            # Cheap draft-mode prepass: duplicates skip the encode
+            if self.check_duplicate(category, image, local_path, phash):
+                return done()
+            then(self.optimize_image(download_path),
+                 lambda outputs: optimized(outputs, phash, cache_key, source_bytes))
+
+        def optimized(outputs: List[Dict], phash: Optional[str], cache_key: str,
+                      source_bytes: int):
+            if not outputs:
+                return failed()
+            # Compression is measured on images optimized this run
+            self.metrics.add_bytes('in', source_bytes)
+            self.metrics.add_bytes('encoded', sum(len(o['data']) for o in outputs))
+            done((category, image, local_path, outputs, phash, cache_key))
+
+        try:
+            logger.info(f"Processing: {image['name']}")
+
+            # Drive's checksum lets a cache hit skip the download as well
+            outputs = None
+            if image.get('md5Checksum'):
+                outputs = self.cache.get(self.cache.key(image['md5Checksum']))
+
+            if outputs is None:
+                # Download image to a temp file; optimize workers open it by path
+                fd, download_path = tempfile.mkstemp(dir=work_dir)
+                with os.fdopen(fd, 'wb') as download:
+                    with self.metrics.time('download'):
+                        source_hash = self.download_image(image['id'], image['name'], download)
+                if not source_hash:
+                    return failed()
+
+                if image.get('md5Checksum') and source_hash != image['md5Checksum']:
+                    logger.error(f"Checksum mismatch downloading {image['name']}")
+                    return failed()
+
+                cache_key = self.cache.key(source_hash)
+                if not image.get('md5Checksum'):
+                    outputs = self.cache.get(cache_key)
+
+                if outputs is None:
+                    source_bytes = os.path.getsize(download_path)
+                    if self.duplicates is None:
+                        return hashed(None, cache_key, source_bytes)
+                    return then(self.hash_image(download_path),
+                                lambda phash: hashed(phash, cache_key, source_bytes))
+
+            logger.info(f"Cache hit: {image['name']}")
+            if self.duplicates is None:
+                return cached(outputs, None)
+            main_output = next(o for o in outputs if not o['suffix'] and o['format'] == 'JPEG')
+            then(self.hash_image(main_output['data']), lambda phash: cached(outputs, phash))
+        except Exception as e:
+            failed(e)
 
-                logger.info(f"Updated: {local_path}")
-                updated_count += 1
+    def _write_stage(self, write_queue: queue.Queue, updated: Dict[str, int],
+                     slots: threading.BoundedSemaphore):
+        """Write optimized images until the end-of-stream marker arrives,
+        releasing each image's in-flight slot once it is written."""
+        last_checkpoint = time.monotonic()
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            category, image, local_path, outputs, phash, cache_key = item
+            try:
+                if cache_key:
+                    self.cache.put(cache_key, outputs)
+
+                changed = False
+                variants = []
+                for output in outputs:
+                    extension = FORMAT_EXTENSIONS[output['format']]
+                    path = local_path.with_name(f"{local_path.stem}{output['suffix']}{extension}")
+
+                    # Check if update needed
+                    with self.metrics.time('hash'):
+                        update = self.should_update_file(path, output['data'])
+                    if update:
+                        # Save optimized image
+                        with self.metrics.time('write'):
+                            atomic_write(path, output['data'])
+                        self.metrics.add_bytes('out', len(output['data']))
+                        changed = True
+
+                    variants.append({
+                        "path": path.relative_to(self.gallery_base).as_posix(),
+                        "format": output['format'],
+                        "width": output['width'],
+                        "height": output['height'],
+                        "bytes": len(output['data'])
+                    })
+
+                if changed:
+                    logger.info(f"Updated: {local_path}")
+                    updated[category] = updated.get(category, 0) + 1
+                else:
+                    logger.info(f"Skipped (no changes): {local_path}")
+
+                main_output = next(o for o in outputs if not o['suffix'] and o['format'] == 'JPEG')
+                self.manifest.record(
+                    image, category,
+                    local_path.relative_to(self.gallery_base).as_posix(),
+                    self.get_data_hash(main_output['data']),
+                    sorted(variants, key=lambda v: (v['format'], v['width'])),
+                    dhash=phash,
+                    duplicate_of=self.duplicate_of.get(image['id']),
+                    placeholder=main_output.get('placeholder')
+                )
+                self.checkpoint.mark_done(image['id'], self.manifest.get(image['id']))
+
+                # Persist progress so a restarted run skips finished files
+                if time.monotonic() - last_checkpoint > CHECKPOINT_INTERVAL:
+                    self.manifest.save()
+                    last_checkpoint = time.monotonic()
+            except Exception as e:
+                # Never let one file kill the only writer: downloads would
+                # block forever waiting for in-flight slots
+                logger.error(f"Error writing {local_path}: {e}")
+                self.mark_failed(category, image)
+            finally:
+                slots.release()
+
+    def sync_images(self, entries: Iterable[Tuple[str, Dict]]) -> Dict[str, int]:
+        """Run (category, image) entries through the download/optimize/write pipeline.
+
+        Downloads run on a thread pool, optimization on the process pool and
+        writes on a single writer thread; download threads hand each image to
+        the pool and go straight back to downloading. At most
+        ``max_in_flight`` images are between download and write, so memory
+        stays flat however many images are listed. Returns the number of
+        updated files per category.
+        """
+        updated: Dict[str, int] = {}
+        if self.duplicate_mode != 'off' and self.duplicates is None:
+            self.build_duplicate_index()
+
+        # Each image holds a slot from before its download until it is
+        # written (or dropped), which also bounds the write queue
+        slots = threading.BoundedSemaphore(self.max_in_flight)
+        write_queue: queue.Queue = queue.Queue()
+        writer = threading.Thread(target=self._write_stage, args=(write_queue, updated, slots),
+                                  daemon=True)
+        writer.start()
+
+        def finish(item: Optional[Tuple]):
+            if item is None:
+                slots.release()
             else:
-                logger.info(f"Skipped (no changes): {local_path}")
+                write_queue.put(item)
+
+        try:
+            with tempfile.TemporaryDirectory(prefix='gallery-sync-') as work_dir, \
+                    ThreadPoolExecutor(max_workers=self.concurrency) as downloads:
+                try:
+                    for category, image in entries:
+                        if category not in updated:
+                            (self.gallery_base / category).mkdir(exist_ok=True)
+                            updated[category] = 0
+
+                        # Unchanged in Drive since the last sync: skip the download
+                        if (not self.force_sync
+                                and self.manifest.is_unchanged(image, self.gallery_base)):
+                            logger.info(f"Skipped (unchanged in Drive): {image['name']}")
+                            continue
+
+                        # Generate local filename
+                        local_path = self.output_path_for(category, image)
+
+                        slots.acquire()
+                        downloads.submit(self._fetch_stage, category, image, local_path, work_dir,
+                                         finish)
+                finally:
+                    downloads.shutdown()
+                    # Wait for images still being optimized or written, before
+                    # their downloads' directory is removed
+                    for _ in range(self.max_in_flight):
+                        slots.acquire()
+        finally:
+            write_queue.put(None)
+            writer.join()
+
+        return updated
+
+    def sync_category(self, category: str, folder_id: str) -> int:
+        """Sync all images from a category folder."""
+        logger.info(f"Syncing category: {category}")
+
+        # Get all images from Drive
+        images = self.list_images(folder_id)
+        updated_count = self.sync_images((category, image) for image in images).get(category, 0)
 
         logger.info(f"Category {category}: {updated_count} files updated")
         return updated_count
 
-    def cleanup_old_images(self, category: str, current_images: List[str]):
-        """Remove images that are no longer in Google Drive."""
+    def is_sync_output(self, category: str, filename: str) -> bool:
+        """Check whether a filename looks like one the sync writes:
+        ``<category>-<name>-<file key>`` or the older position-based
+        ``<category>-<name>-<n>``, plus any variant suffix. Hand-named files
+        can match too, so this only decides what cleanup reports."""
+        extensions = '|'.join(map(re.escape, OUTPUT_EXTENSIONS))
+        pattern = rf"{re.escape(category)}-.+-([0-9a-f]{{8}}|\d+)(-\d+w)?({extensions})"
+        return re.fullmatch(pattern, filename) is not None
+
+    def cleanup_old_images(self, category: str, expected: set,
+                           dry_run: bool = False) -> Tuple[int, int, int]:
+        """Remove synced images that no longer belong to any manifest entry.
+
+        ``expected`` holds the manifest's output paths for the category. The
+        category directory is scanned once. Only files the sync recorded
+        writing (``SyncManifest.written``) are removed; files that merely look
+        like sync outputs are reported and left alone. Returns the number of
+        orphans, the bytes they used and the number of unrecorded files.
+        """
         category_dir = self.gallery_base / category
         if not category_dir.exists():
-            return
+            return 0, 0, 0
+
+        written = self.manifest.written
+        orphans, unrecorded, on_disk = [], [], set()
+        with os.scandir(category_dir) as it:
+            for entry in it:
+                path = f"{category}/{entry.name}"
+                on_disk.add(path)
+                if not entry.is_file() or path in expected:
+                    continue
+                if path in written or entry.name.startswith('.tmp-'):
+                    orphans.append(entry)
+                elif self.is_sync_output(category, entry.name):
+                    unrecorded.append(entry)
+
+        # Recorded outputs already gone from disk need no further tracking
+        self.manifest.forget_written(
+            path for path in list(written)
+            if path.split('/')[0] == category and path not in expected and path not in on_disk
+        )
+
+        for entry in unrecorded:
+            logger.info(f"Leaving file the sync did not write: {entry.path}")
+
+        reclaimed = 0
+        removed = []
+        for entry in orphans:
+            size = entry.stat().st_size
+            if dry_run:
+                logger.info(f"Would remove orphaned file: {entry.path}")
+            else:
+                logger.info(f"Removing orphaned file: {entry.path}")
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    continue
+                removed.append(f"{category}/{entry.name}")
+            reclaimed += size
+        self.manifest.forget_written(removed)
+
+        return len(orphans), reclaimed, len(unrecorded)
+
+    def cleanup(self, categories: Iterable[str]) -> Dict:
+        """Remove orphaned outputs from every category directory."""
+        expected = self.manifest.expected_outputs()
+        removed = reclaimed = unrecorded = 0
+        for category in sorted(categories):
+            count, size, unknown = self.cleanup_old_images(
+                category, expected.get(category, set()), self.cleanup_dry_run)
+            removed += count
+            reclaimed += size
+            unrecorded += unknown
+
+        verb = "Would reclaim" if self.cleanup_dry_run else "Reclaimed"
+        logger.info(f"Cleanup: {removed} orphaned files. {verb} {reclaimed / 1024:.1f} KB")
+        if unrecorded:
+            logger.info(f"Cleanup: left {unrecorded} files the sync did not write")
+        return {"files_removed": removed, "bytes_reclaimed": reclaimed,
+                "files_unrecorded": unrecorded, "dry_run": self.cleanup_dry_run}
+
+    def gallery_index(self, category: str) -> Dict:
+        """Compact index of a category's synced images, newest first.
+
+        Lists each image's main file, dimensions, aspect ratio, placeholder
+        and variants, so the gallery page can reserve space and lazy-load
+        without fetching images to measure them. Duplicates of a photo in
+        the same category are left out.
+        """
+        files = self.manifest.files
+        images = []
+        for file_id, entry in files.items():
+            if entry['category'] != category:
+                continue
+            original = files.get(entry.get('duplicate_of'))
+            if original and original['category'] == category:
+                continue
+
+            main = next((v for v in entry['variants'] if v['path'] == entry['output_path']), None)
+            if main is None:
+                continue
+            images.append({
+                "src": entry['output_path'],
+                "width": main['width'],
+                "height": main['height'],
+                "aspect": round(main['width'] / main['height'], 4),
+                "placeholder": entry.get('placeholder'),
+                "modified": entry.get('modifiedTime'),
+                "variants": [
+                    {"src": v['path'], "format": v['format'], "width": v['width']}
+                    for v in entry['variants']
+                ]
+            })
+
+        images.sort(key=lambda image: (image['modified'] or '', image['src']), reverse=True)
+        return {"version": 1, "category": category, "images": images}
+
+    def write_gallery_indexes(self, categories: Iterable[str]) -> int:
+        """Write each category's gallery-index.json, only where it changed.
+
+        The index has no timestamp, so an unchanged gallery never produces
+        a commit. Returns the number of indexes written.
+        """
+        written = 0
+        for category in categories:
+            path = self.gallery_base / category / GALLERY_INDEX_NAME
+            data = json.dumps(self.gallery_index(category), separators=(',', ':')).encode()
+            try:
+                if path.read_bytes() == data:
+                    continue
+            except OSError:
+                pass
+            path.parent.mkdir(exist_ok=True)
+            atomic_write(path, data)
+            written += 1
+        return written
+
+    def sync_changes(self, main_folder_id: str) -> Optional[Tuple[Dict[str, int], str]]:
+        """Sync only the files changed since the stored changes page token.
+
+        Returns the updated counts and the next page token, or None when a
+        full listing is needed instead (no token, expired token, or the
+        category folder layout changed).
+        """
+        if (not self.manifest.changes_page_token or not self.manifest.folders
+                or self.manifest.root_folder_id != main_folder_id):
+            logger.info("No usable changes page token, falling back to full listing")
+            return None
+
+        if self.manifest.settings_changed():
+            # Unchanged files need re-encoding too, so the change feed is not enough
+            logger.info("Optimizer settings changed, falling back to full listing")
+            return None
+
+        start = time.perf_counter()
+        result = self.list_changes(self.manifest.changes_page_token)
+        self.metrics.add('list', time.perf_counter() - start, len(result[0]) if result else 0)
+        if result is None:
+            logger.info("Changes page token expired, falling back to full listing")
+            return None
+        changes, next_token = result
+
+        folder_categories = {
+            folder_id: category for category, folder_id in self.manifest.folders.items()
+        }
+
+        # Keep only the latest change per file
+        latest = {}
+        for change in changes:
+            latest[change['fileId']] = change
+
+        entries = []
+        for file_id, change in latest.items():
+            file = change.get('file') or {}
+            parents = file.get('parents', [])
+
+            if file.get('mimeType') == FOLDER_MIME_TYPE:
+                if file_id in folder_categories or main_folder_id in parents:
+                    logger.info(f"Category folder changed ({file.get('name', file_id)}), "
+                                "falling back to full listing")
+                    return None
+                continue
+
+            category = next((folder_categories[p] for p in parents if p in folder_categories), None)
+            live = not change.get('removed') and not file.get('trashed')
+
+            if not live or category is None or file.get('mimeType') not in IMAGE_MIME_TYPES:
+                # Its outputs become orphans for the cleanup stage
+                self.manifest.remove(file_id)
+                continue
+
+            entry = self.manifest.get(file_id)
+            if entry and entry['category'] != category:
+                # Moved between category folders
+                self.manifest.remove(file_id)
+            entries.append((category, file))
 
-        # Get all existing files
-        existing_files = list(category_dir.glob("*.jpg"))
+        # Files that failed last run and have not changed since
+        retries = [
+            (retry['category'], retry['file']) for file_id, retry in self.manifest.retry.items()
+            if file_id not in latest and retry['category'] in self.manifest.folders
+        ]
+        entries.extend(retries)
 
-        for file_path in existing_files:
-            # If file doesn't match current naming pattern, remove it
-            if not any(file_path.name.startswith(f"{category}-") for _ in current_images):
-                logger.info(f"Removing old file: {file_path}")
-                file_path.unlink()
+        logger.info(f"Incremental sync: {len(latest)} changed files, {len(retries)} retried, "
+                    f"{len(entries)} to sync")
+        return self.sync_images(entries), next_token
+
+    def sync_all(self, category_folders: Dict[str, str],
+                 resume: Optional[Dict] = None) -> Dict[str, int]:
+        """List every category and sync all of its images.
+
+        With ``resume``, the listing recorded in an interrupted run's
+        checkpoint is replayed instead of querying Drive, skipping files that
+        run already finished.
+        """
+        folder_categories = {
+            folder_id: category for category, folder_id in category_folders.items()
+        }
+        seen_ids = set()
+
+        # One streamed listing for all categories, run on its own thread so
+        # it completes (and is checkpointed) quickly while the pipeline starts
+        # on the first page. Only metadata is queued; backpressure applies to
+        # downloads, not to listing.
+        listed: queue.Queue = queue.Queue()
+
+        def list_all():
+            start = time.perf_counter()
+            try:
+                for image in self.iter_images(list(folder_categories)):
+                    for parent in image.get('parents', []):
+                        if parent in folder_categories:
+                            seen_ids.add(image['id'])
+                            self.checkpoint.add_entry(folder_categories[parent], image)
+                            listed.put((folder_categories[parent], image))
+                            break
+                if not self.listing_errors:
+                    self.checkpoint.mark_listed()
+            except Exception as e:
+                # The listing is incomplete: keep it from being used to prune
+                logger.error(f"Error listing images: {e}")
+                self.listing_errors.update(folder_categories)
+            finally:
+                self.metrics.add('list', time.perf_counter() - start, len(seen_ids))
+                listed.put(None)
+
+        def entries():
+            threading.Thread(target=list_all, daemon=True).start()
+            while True:
+                item = listed.get()
+                if item is None:
+                    return
+                yield item
+
+        def resumed_entries():
+            for category, image in resume['entries']:
+                seen_ids.add(image['id'])
+                # Outputs may be missing if the interrupted run was on another
+                # checkout (CI); those are redone, usually from the cache
+                if (image['id'] not in resume['done']
+                        or not self.manifest.outputs_exist(image['id'], self.gallery_base)):
+                    yield category, image
+
+        updated = self.sync_images(resumed_entries() if resume else entries())
+
+        # Files gone from Drive; only trusted when every listing succeeded
+        if not self.listing_errors:
+            pruned = self.manifest.prune(category_folders, seen_ids)
+            if pruned:
+                logger.info(f"{pruned} files no longer in Drive")
+        return updated
 
     def run_sync(self):
         """Main sync process."""
-        logger.info("Starting gallery sync from Google Drive")
+        started = time.perf_counter()
+        logger.info(f"Starting gallery sync from {self.source.name}")
 
         # Get main folder ID
-        main_folder_id = self.get_drive_folder_id()
+        main_folder_id = self.get_root_folder_id()
         logger.info(f"Main folder ID: {main_folder_id}")
 
-        # Get category folders
-        category_folders = self.list_folders(main_folder_id)
+        self.start_optimize_pool()
+        try:
+            result = None if self.force_sync else self.sync_changes(main_folder_id)
 
-        if not category_folders:
-            logger.warning("No category folders found in Google Drive")
-            return
+            if result is not None:
+                mode = "incremental"
+                updated, next_token = result
+                categories_synced = len(updated)
+            else:
+                mode = "full"
+                resume = self.checkpoint.load(main_folder_id)
 
-        total_updated = 0
+                if resume:
+                    logger.info(
+                        f"Resuming sync started {resume['started_at']}: "
+                        f"{len(resume['done'])} of {len(resume['entries'])} files already done"
+                    )
+                    next_token = resume['start_page_token']
+                    category_folders = resume['folders']
+                    self.manifest.restore(resume['done'])
+                    self.checkpoint.reopen()
+                else:
+                    # Taken before listing so changes made during the sync are
+                    # picked up by the next run
+                    next_token = self.get_start_page_token()
 
-        # Sync each category
-        for category, folder_id in category_folders.items():
-            try:
-                updated = self.sync_category(category, folder_id)
-                total_updated += updated
-            except Exception as e:
-                logger.error(f"Error syncing category {category}: {e}")
+                    # Get category folders
+                    category_folders = self.list_folders(main_folder_id)
 
-        logger.info(f"Sync complete. Total files updated: {total_updated}")
+                    if category_folders is None:
+                        logger.error("Could not list category folders in Google Drive")
+                        return self.write_status({"status": "failed", "mode": mode})
 
-        # Create status file
-        status = {
-            "last_sync": "$(date -Iseconds)",
-            "categories_synced": len(category_folders),
+                    if not category_folders:
+                        logger.warning("No category folders found in Google Drive")
+                        return self.write_status({"status": "empty", "mode": mode})
+
+                    self.checkpoint.start({
+                        "root_folder_id": main_folder_id,
+                        "start_page_token": next_token,
+                        "folders": category_folders
+                    })
+
+                updated = self.sync_all(category_folders, resume)
+                categories_synced = len(category_folders)
+                self.manifest.root_folder_id = main_folder_id
+                self.manifest.folders = category_folders
+
+            # Needs every original written (and pruned files forgotten)
+            self.resolve_duplicates()
+
+            if self.listing_errors:
+                # Incomplete listing: neither trust it for cleanup nor advance
+                # the changes token past files that were never seen
+                logger.warning("Some listings failed; skipping cleanup and forcing a full "
+                               "listing next run")
+                next_token = None
+                cleanup = None
+            else:
+                cleanup = self.cleanup(self.manifest.folders)
+
+            # The token still advances; failed files are re-queued by id
+            # next run rather than forcing a full listing
+            self.manifest.retry = dict(self.failed_images)
+            if self.failed_files:
+                logger.warning(f"{len(self.failed_files)} files failed to sync; "
+                               "they will be retried next run")
+
+            indexes = self.write_gallery_indexes(self.manifest.folders)
+            if indexes:
+                logger.info(f"Updated {indexes} gallery index files")
+
+            self.manifest.changes_page_token = next_token
+            self.checkpoint.finish()
+        finally:
+            self.stop_optimize_pool()
+            self.manifest.save()
+            self.cache.evict()
+
+        for category, count in sorted(updated.items()):
+            logger.info(f"Category {category}: {count} files updated")
+        total_updated = sum(updated.values())
+
+        logger.info(f"Sync complete ({mode}). Total files updated: {total_updated}")
+
+        categories = self.category_status(updated)
+        states = {info['status'] for info in categories.values()}
+        if states == {'failed'}:
+            overall = 'failed'
+        elif states & {'failed', 'partial'}:
+            overall = 'partial'
+        elif states == {'empty'}:
+            overall = 'empty'
+        else:
+            overall = 'ok'
+
+        return self.write_status({
+            "status": overall,
+            "mode": mode,
+            "categories_synced": categories_synced,
             "files_updated": total_updated,
+            "files_failed": len(self.failed_files),
+            "duplicates": len(self.duplicate_of),
+            "categories": categories,
+            "cleanup": cleanup,
+            "metrics": self.metrics_report(time.perf_counter() - started)
+        })
+
+    def metrics_report(self, wall_seconds: float) -> Dict:
+        """Run metrics for sync-status.json."""
+        byte_counts = self.metrics.bytes
+        lookups = self.cache.hits + self.cache.misses
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "stages": self.metrics.stages(),
+            "bytes_in": byte_counts.get('in', 0),
+            "bytes_encoded": byte_counts.get('encoded', 0),
+            "bytes_out": byte_counts.get('out', 0),
+            "compression_ratio": (
+                round(byte_counts['in'] / byte_counts['encoded'], 2)
+                if byte_counts.get('encoded') else None
+            ),
+            "cache": {
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+                "hit_rate": round(self.cache.hits / lookups, 3) if lookups else None
+            },
+            "retries": self.source.retries,
+            "slowest_files": self.metrics.slowest_files()
+        }
+
+    def category_status(self, updated: Dict[str, int]) -> Dict[str, Dict]:
+        """Per-category outcome: ok, empty (no images in Drive), failed
+        (listing failed) or partial (some files failed)."""
+        images: Dict[str, int] = {}
+        for entry in self.manifest.files.values():
+            images[entry['category']] = images.get(entry['category'], 0) + 1
+        failed: Dict[str, int] = {}
+        for category in self.failed_files.values():
+            failed[category] = failed.get(category, 0) + 1
+
+        categories = {}
+        for category, folder_id in sorted(self.manifest.folders.items()):
+            if folder_id in self.listing_errors:
+                status = 'failed'
+            elif failed.get(category):
+                status = 'partial'
+            elif not images.get(category):
+                status = 'empty'
+            else:
+                status = 'ok'
+            categories[category] = {
+                "status": status,
+                "images": images.get(category, 0),
+                "updated": updated.get(category, 0),
+                "failed": failed.get(category, 0)
+            }
+        return categories
+
+    def write_status(self, status: Dict) -> Dict:
+        """Write sync-status.json for the workflow and return it."""
+        status = {
+            "last_sync": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            **status,
             "force_sync": self.force_sync
         }
+        atomic_write_json(self.gallery_base / 'sync-status.json', status, indent=2)
+        return status
+
+
+def format_bytes(amount: int) -> str:
+    """Human-readable byte count."""
+    for unit in ('B', 'KB', 'MB'):
+        if amount < 1024:
+            return f"{amount:.0f} {unit}" if unit == 'B' else f"{amount:.1f} {unit}"
+        amount /= 1024
+    return f"{amount:.1f} GB"
+
+
+def status_markdown(status: Dict) -> str:
+    """Render sync-status.json as Markdown for the GitHub job summary."""
+    lines = [
+        "### Gallery Sync Metrics",
+        "",
+        f"- **Result:** {status.get('status', 'unknown')} ({status.get('mode', 'n/a')} sync)",
+        f"- **Files updated:** {status.get('files_updated', 0)}, "
+        f"failed: {status.get('files_failed', 0)}"
+    ]
+    metrics = status.get('metrics')
+    if not metrics:
+        return "\n".join(lines) + "\n"
+
+    cache = metrics['cache']
+    hit_rate = f"{cache['hit_rate']:.0%}" if cache['hit_rate'] is not None else "n/a"
+    ratio = f"{metrics['compression_ratio']}x" if metrics['compression_ratio'] else "n/a"
+    lines += [
+        f"- **Wall time:** {metrics['wall_seconds']:.1f}s",
+        f"- **Bytes in/out:** {format_bytes(metrics['bytes_in'])} downloaded, "
+        f"{format_bytes(metrics['bytes_out'])} written (compression {ratio})",
+        f"- **Cache:** {cache['hits']} hits, {cache['misses']} misses ({hit_rate})",
+        f"- **Retries:** {metrics['retries']}",
+        "",
+        "| Stage | Busy time (s) | Items | Items/s |",
+        "|-------|--------------:|------:|--------:|"
+    ]
+    for stage, info in metrics['stages'].items():
+        per_second = info['per_second'] if info['per_second'] is not None else "-"
+        lines.append(f"| {stage} | {info['seconds']:.2f} | {info['count']} | {per_second} |")
+
+    if metrics['slowest_files']:
+        lines += ["", "| Slowest files | Category | Seconds |", "|------|----------|--------:|"]
+        for file in metrics['slowest_files']:
+            lines.append(f"| {file['name']} | {file['category']} | {file['seconds']:.2f} |")
+    return "\n".join(lines) + "\n"
 
-        with open(self.gallery_base / 'sync-status.json', 'w') as f:
-            json.dump(status, f, indent=2)
 
 def main():
     """Main entry point."""
+    # Print the last run's status as Markdown instead of syncing
+    if sys.argv[1:] == ['--summary']:
+        status_file = Path('docs/gallery/images/sync-status.json')
+        if status_file.exists():
+            with open(status_file) as f:
+                print(status_markdown(json.load(f)))
+        return
+
     try:
         sync = GallerySync()
-        sync.run_sync()
+        status = sync.run_sync()
+        if status['status'] == 'failed':
+            logger.error("Sync failed: nothing could be listed from the source")
+            sys.exit(1)
     except KeyboardInterrupt:
         logger.info("Sync interrupted by user")
         sys.exit(1)
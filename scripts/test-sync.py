@@ -26,10 +26,10 @@ try:
 
         try:
             sync = GallerySync()
-            print("✅ Google Drive authentication successful")
+            print(f"✅ Connected to {sync.source.name}")
 
             # Get main folder
-            main_folder_id = sync.get_drive_folder_id()
+            main_folder_id = sync.get_root_folder_id()
             print(f"📁 Main folder ID: {main_folder_id}")
 
             # List category folders
@@ -56,6 +56,29 @@ try:
             print(f"❌ Test failed: {e}")
             return False
 
+    def test_optimizer():
+        """Check the optimizer gives every original an unsuffixed main JPEG."""
+        print("\n🖼️  Testing image optimizer...")
+
+        import io
+        from PIL import Image
+
+        ok = True
+        # Wider than the 1200px main size, and narrower than it
+        for width, height in ((2400, 1600), (800, 600)):
+            buffer = io.BytesIO()
+            Image.new('RGB', (width, height), (120, 90, 60)).save(buffer, format='JPEG')
+            outputs = sync_gallery.optimize_image_data(buffer.getvalue(), 1200, 85,
+                                                       (320, 640, 960, 1920))
+            main = [o for o in outputs if not o['suffix'] and o['format'] == 'JPEG']
+            if len(main) == 1 and main[0]['width'] == min(width, 1200):
+                variants = sorted(o['width'] for o in outputs if o['suffix'])
+                print(f"✅ {width}x{height}: main {main[0]['width']}px, variants {variants}")
+            else:
+                print(f"❌ {width}x{height}: no main output ({len(outputs)} outputs)")
+                ok = False
+        return ok
+
     def test_local_setup():
         """Test local environment setup."""
         print("\n🔧 Testing local setup...")
@@ -87,14 +110,22 @@ try:
         print("🚀 Gallery Sync Test\n")
 
         test_local_setup()
-
-        # Only test connection if basic setup looks good
-        if Path('service-account.json').exists() and os.getenv('GOOGLE_DRIVE_FOLDER_ID'):
+        optimizer_ok = test_optimizer()
+
+        # Only test connection if basic setup looks good (a local
+        # GALLERY_SOURCE directory needs no credentials)
+        local_source = os.getenv('GALLERY_SOURCE', 'drive') != 'drive'
+        drive_configured = (Path('service-account.json').exists()
+                            and os.getenv('GOOGLE_DRIVE_FOLDER_ID'))
+        if local_source or drive_configured:
             test_connection()
         else:
             print("\n⚠️  Skipping connection test - setup incomplete")
             print("   Complete local setup first")
 
+        if not optimizer_ok:
+            sys.exit(1)
+
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("Install dependencies: pip install -r requirements.txt")